@@ -1,7 +1,22 @@
 import csv
+import gzip
+import html
+import io
+import json
 import os
+import tarfile
+import time
+import uuid
+import zipfile
 
-from qgis.core import QgsVectorLayer, QgsWkbTypes, QgsRasterLayer
+from qgis.core import (Qgis, QgsApplication, QgsMessageLog, QgsProviderRegistry, QgsVectorLayer, QgsWkbTypes,
+                       QgsRasterLayer)
+
+from .dependency_graph import build_dependency_graph
+from .layer_filter import select_layers
+from .raster_probe import RASTER_DETAILS_KEYS, RasterProbeCache, probe_rasters
+from .sections import (BUNDLE_FORMATS, HTML_SECTIONS, OUTPUT_FORMATS, SECTIONS, SECTION_COLUMN_NAMES,
+                       SECTION_FILE_NAMES)
 
 CSS = """
     <style>
@@ -62,6 +77,9 @@ html,body {
       }
     </style>"""
 
+# Maximum seconds between two flushes of the NDJSON stream
+NDJSON_FLUSH_INTERVAL = 1.0
+
 
 def get_url(layer_object):
     """Returns the URL of a layer object.
@@ -82,6 +100,32 @@ def get_url(layer_object):
     return path_url
 
 
+def raster_dataset(layer):
+    """Returns the dataset of a GDAL raster layer.
+
+    Parameters:
+    layer (QgsRasterLayer): the raster layer
+
+    Returns:
+    tuple: (key, source, path) where the key identifies the dataset (normalized file path, with the /vsi prefix and
+    suffix and the subdataset or layer name if there are any), the source is the GDAL data source to open and the
+    path is the path of the file
+    """
+
+    source = layer.source()
+    parts = QgsProviderRegistry.instance().decodeUri('gdal', source)
+    path = parts.get('path') or source
+    if os.path.exists(path):
+        path = os.path.normcase(os.path.abspath(path))
+
+    key = '{}{}{}'.format(parts.get('vsiPrefix') or '', path, parts.get('vsiSuffix') or '')
+    if parts.get('layerName'):
+        key += '|{}'.format(parts['layerName'])
+
+    # The open options of QGIS (|option:...) are not part of the GDAL data source
+    return key, source.split('|')[0], path
+
+
 def create_table(title, headers, data, single_row=False):
     """Creates an HTML table from a list of headers and a list of data rows.
 
@@ -120,6 +164,34 @@ def create_table(title, headers, data, single_row=False):
     return "<div>{}<table>{}</table></div>".format(title, "\n".join(table_html))
 
 
+def group_by_layer(data):
+    """Groups the rows of a section by their layer_id column (second column).
+
+    Parameters:
+    data (iterable): the rows of the section
+
+    Returns:
+    dict: a dictionary with the layer ids as keys and the lists of rows as values
+    """
+
+    grouped = {}
+    for row in data:
+        grouped.setdefault(row[1], []).append(row)
+    return grouped
+
+
+def write_ndjson_record(stream, record):
+    """Writes a record as a JSON line.
+
+    Parameters:
+    stream (file object): a text stream
+    record (dict): the record to be written
+    """
+
+    stream.write(json.dumps(record, ensure_ascii=False, default=str))
+    stream.write('\n')
+
+
 def remove_outputfolders(main_directory):
     """Remove all files and subfolders within a given folder, then remove the folder itself.
 
@@ -139,11 +211,69 @@ def remove_outputfolders(main_directory):
         print(f"An error occurred: {e}")
 
 
+class CrsDescriptionCache:
+    """Memoized descriptions of coordinate reference systems with timing of the lookups. Each report has its own
+    cache, so a user CRS edited during the QGIS session is described again by the next report."""
+
+    def __init__(self):
+        """Class Constructor."""
+
+        self.descriptions = {}
+        self.lookups = 0
+        self.misses = 0
+        self.elapsed = 0.0
+
+    def description(self, crs):
+        """Returns the 'authid description' string of a CRS, computing it only once per CRS.
+
+        The CRSs are identified by their authority id or, for custom CRSs, by their internal srsid. CRSs without
+        any of them are not cached, as the only other key (their WKT) is more expensive than the description.
+
+        :param crs: Coordinate reference system
+        :type crs: QgsCoordinateReferenceSystem
+
+        :returns: Authority identifier and description of the CRS
+        :rtype: str
+        """
+
+        start = time.perf_counter()
+        authid = crs.authid()
+        key = authid or (f'srsid:{crs.srsid()}' if crs.srsid() else None)
+        description = self.descriptions.get(key) if key else None
+        if description is None:
+            self.misses += 1
+            description = f'{authid} {crs.description()}'
+            if key:
+                self.descriptions[key] = description
+        self.lookups += 1
+        self.elapsed += time.perf_counter() - start
+        return description
+
+    def clear(self):
+        """Removes the cached descriptions and resets the counters."""
+
+        self.descriptions.clear()
+        self.lookups = 0
+        self.misses = 0
+        self.elapsed = 0.0
+
+    def timing(self):
+        """Returns a summary of the lookups made through this cache."""
+
+        return f'{self.lookups} CRS lookups ({self.misses} computed, {self.lookups - self.misses} cached) ' \
+               f'in {self.elapsed * 1000:.1f} ms'
+
+
 class QProjectReport:
     """ Class with information and properties of QGIS projects and their objects (layers, fields and layouts)
-    and generation of output files."""
+    and generation of output files.
+
+    The rows of every section are produced lazily by the ``iter_*`` generators (``iter_fields``,
+    ``iter_vector_layers``...), so they can be streamed to any sink without building the whole
+    project inventory in memory. The ``*_data`` attributes collect them in lists the first time
+    they are accessed."""
 
-    def __init__(self, qgsproject, output_directory):
+    def __init__(self, qgsproject, output_directory, layer_filter=None, raster_cache_file=None):
         """Class Constructor. Generates the attributes relative to the QGIS project.
 
         :param qgsproject: QGIS project
@@ -151,6 +281,14 @@ class QProjectReport:
 
         :param output_directory: Directory for creating folders and property files
         :type output_directory: str
+
+        :param layer_filter: Selection of the layers to be reported (all the layers by default): a LayerFilter or
+            a function that receives a layer and returns True if it must be reported
+        :type layer_filter: LayerFilter or function
+
+        :param raster_cache_file: JSON file where the raster details are cached between runs
+            (project_report_raster_cache.json in the QGIS profile folder by default)
+        :type raster_cache_file: str
         """
 
         # Project
@@ -161,6 +299,7 @@ class QProjectReport:
             self.folder, 'untitled_project')
         self.csv_directory = os.path.join(self.report_directory, 'csv')
         self.html_directory = os.path.join(self.report_directory, 'html')
+        self.ndjson_directory = os.path.join(self.report_directory, 'ndjson')
 
         self.project_column_names = ['title',
                                      'file_name',
@@ -170,13 +309,14 @@ class QProjectReport:
                                      'creation_date',
                                      'last_save_date'
                                      ]
+        self.crs_cache = CrsDescriptionCache()
         self.project_file_path = os.path.split(self.qgsproject.fileName())[0]
         self.project_file_name = os.path.split(self.qgsproject.fileName())[1]
         self.project_data = [
             self.qgsproject.title(),
             self.project_file_name,
             self.project_file_path,
-            f'{self.qgsproject.crs().authid()} {self.qgsproject.crs().description()}',
+            self.crs_cache.description(self.qgsproject.crs()),
             self.qgsproject.count(),
             self.qgsproject.metadata().creationDateTime().date().toString("yyyy-MM-dd"),
             self.qgsproject.lastSaveDateTime().date().toString("yyyy-MM-dd")
@@ -184,29 +324,19 @@ class QProjectReport:
 
         ## Relations
 
-        self.project_relations_column_names = ['name',
+        self.project_relations_column_names = ['id',
+                                               'name',
                                                'referenced_layer',
                                                'referencing_layer',
                                                'field_pairs'
                                                ]
-        self.project_relations_data = []
 
         self.relations = self.qgsproject.relationManager().relations()
 
-        for k, v in self.relations.items():
-            name = v.name() # Returns a human readable name for this relation.
-            ## print(v.referencedFields()) # Returns a list of attributes used to form the referenced fields (most likely primary key) on the referenced (parent) layer.
-            referencedLayer = v.referencedLayer().name() # Access the referenced (parent) layer
-            ## print(v.referencingFields()) # Returns a list of attributes used to form the referencing fields (foreign key) on the referencing (child) layer.
-            referencingLayer = v.referencingLayer().name() # Access the referencing (child) layer
-            fieldPairs = v.fieldPairs()
-            ## print(v.strength()) # Returns the relation strength as a string
-            ## print(v.type()) # Returns the type of the relation
-
-            self.project_relations_data.append([name, referencedLayer, referencingLayer, fieldPairs])
-
         # Layers
-        self.layers = self.qgsproject.mapLayers().values()
+        self.layer_filter = layer_filter
+        self.layers = select_layers(self.qgsproject, self.qgsproject.mapLayers().values(), self.layer_filter)
+        self.layer_ids = {layer.id() for layer in self.layers}
 
         self.vector_layers_column_names = ['id',
                                            'name',
@@ -221,8 +351,6 @@ class QProjectReport:
                                            'joins'
                                            ]
 
-        self.vector_layers_data = []
-
         self.raster_layers_column_names = ['id',
                                            'name',
                                            'storage',
@@ -232,80 +360,215 @@ class QProjectReport:
                                            'crs_layer',
                                            ]
 
-        self.raster_layers_data = []
+        # Raster details
+        self.raster_details_column_names = ['id', 'layer', 'source'] + RASTER_DETAILS_KEYS
+        self.raster_cache_file = raster_cache_file or os.path.join(QgsApplication.qgisSettingsDirPath(),
+                                                                   'project_report_raster_cache.json')
 
         # Fields
         self.layer_fields_column_names = ["id", "layer_id", "layer", "field_name", "display_name", "alias", "type_name",
                                           "type", "length"]
-        self.layer_fields_data = []
 
         # Joins
-        self.layer_joins_column_names = ["id", "layer_id", "layer", "join_layer", "join_field_name", "target_field_name"]
-        self.layer_joins_data = []
+        self.layer_joins_column_names = ["id", "layer_id", "layer", "join_layer_id", "join_layer", "join_field_name",
+                                         "target_field_name"]
 
-        for index, layer in enumerate(self.layers, start=1):
-            provider = layer.dataProvider()
-            metadata = layer.metadata()
+        # Dependencies
+        self.dependencies_column_names = ["id", "layer_id", "layer", "source_id", "source", "target_id", "target",
+                                          "kind", "expression", "in_cycle"]
+        self.dependency_errors_column_names = ["layer", "source", "kind", "expression", "error"]
 
-            layer_type = 1 if isinstance(layer, QgsVectorLayer) else 0
-            layer_index = index
-            layer_name = layer.name()
-            crs = f'{layer.crs().authid()} {layer.crs().description()}'
-            # path_url = layer.source() if layer_type == 1 else layer.source().split('url=')[1]
-            # comment = provider.dataComment()
-            abstract = metadata.abstract()
-            path_url = get_url(layer)
-            layer_storage = layer.dataProvider().storageType() if layer_type == 1 else layer.providerType()
-            encoding = layer.dataProvider().encoding() if layer_type == 1 else ''
-            geometry = QgsWkbTypes.geometryDisplayString(layer.geometryType()) if layer_type == 1 else ''
-            features = layer.featureCount() if layer_type == 1 else ''
-            joins = len(layer.vectorJoins()) if layer_type == 1 else ''
-            # creationDate = ''
-            # lastSaveDate = ''
+        # Layouts
+        self.layouts = self.qgsproject.layoutManager().layouts()
+
+        self.layouts_column_names = ['id', 'layout_name', 'layout_type', 'atlas', 'atlas_coverageLayer_name']
+
+        # Rows collected by the *_data attributes
+        self._sections_data = {}
+        self._dependency_graph = None
+
+        # Check
+        self.check_project = False
+        self.check_vector_layers = False
+        self.check_raster_layers = False
+        self.check_layouts = False
+        self.check_fields = False
+        self.check_joins = False
+        self.check_relations = False
+        self.check_dependencies = False
+        self.check_raster_details = False
+
+    def iter_layers(self, layer_filter=None):
+        """Yields the layers of the project accepted by the filter.
+
+        :param layer_filter: LayerFilter or function that receives a layer and returns True if it must be reported
+        :type layer_filter: LayerFilter or function
+
+        :returns: Generator of layers
+        """
+
+        yield from select_layers(self.qgsproject, self.layers, layer_filter)
+
+    def iter_project(self, layer_filter=None):
+        """Yields the single row of the project section.
+
+        :param layer_filter: Not used, the project row is always yielded
+        :type layer_filter: function
+        """
+
+        yield self.project_data
+
+    def iter_relations(self, layer_filter=None):
+        """Yields the rows of the relations section.
+
+        :param layer_filter: LayerFilter or function that receives a layer and returns True if it must be
+            reported. Only the relations whose referencing layer is accepted (by this filter and by the
+            layer filter of the report) are yielded.
+        :type layer_filter: LayerFilter or function
+
+        :returns: Generator of [id, name, referenced_layer, referencing_layer, field_pairs] rows
+        """
+
+        layer_ids = self.layer_ids if layer_filter is None else {layer.id() for layer in self.iter_layers(layer_filter)}
+
+        for k, v in self.relations.items():
+            if v.referencingLayer().id() not in layer_ids:
+                continue
+            name = v.name() # Returns a human readable name for this relation.
+            ## print(v.referencedFields()) # Returns a list of attributes used to form the referenced fields (most likely primary key) on the referenced (parent) layer.
+            referencedLayer = v.referencedLayer().name() # Access the referenced (parent) layer
+            ## print(v.referencingFields()) # Returns a list of attributes used to form the referencing fields (foreign key) on the referencing (child) layer.
+            referencingLayer = v.referencingLayer().name() # Access the referencing (child) layer
+            fieldPairs = v.fieldPairs()
+            ## print(v.strength()) # Returns the relation strength as a string
+            ## print(v.type()) # Returns the type of the relation
+
+            # Relation names are not unique, the relation id is
+            yield [k, name, referencedLayer, referencingLayer, fieldPairs]
+
+    def iter_vector_layers(self, layer_filter=None):
+        """Yields the rows of the vector layers section.
 
+        :param layer_filter: LayerFilter or function that receives a layer and returns True if it must be reported
+        :type layer_filter: LayerFilter or function
+
+        :returns: Generator of rows with the vector_layers_column_names columns
+        """
+
+        for layer in self.iter_layers(layer_filter):
             if isinstance(layer, QgsVectorLayer):
-                self.vector_layers_data.append(
-                    [layer_index, layer_name, layer_storage, abstract, path_url, crs, encoding, geometry,
-                     features, joins]) # comment
+                provider = layer.dataProvider()
+                # comment = provider.dataComment()
+                yield [layer.id(), layer.name(), provider.storageType(), layer.metadata().abstract(),
+                       get_url(layer), self.crs_cache.description(layer.crs()), provider.encoding(),
+                       QgsWkbTypes.geometryDisplayString(layer.geometryType()), layer.featureCount(),
+                       len(layer.vectorJoins())] # comment
 
-                for index_field, field in enumerate(layer.fields(), start=1):
-                    field_name = field.name()
-                    display_name = field.displayName()
-                    alias = field.alias()
-                    # comment = field.comment(),
-                    type_name = field.typeName()
-                    field_type = field.type()
-                    length = field.length()
-                    # precision = field.precision(),
+    def iter_raster_layers(self, layer_filter=None):
+        """Yields the rows of the raster layers section.
 
-                    self.layer_fields_data.append(
-                        [index_field, layer_index, layer_name, field_name, display_name, alias, type_name,
-                         field_type, length])
+        :param layer_filter: LayerFilter or function that receives a layer and returns True if it must be reported
+        :type layer_filter: LayerFilter or function
 
-                ## Joins
+        :returns: Generator of rows with the raster_layers_column_names columns
+        """
 
-                if joins > 0:
-                    vector_joins = layer.vectorJoins()
-                    for index_join, join in enumerate(vector_joins, start=1):
-                        join_layer = vector_joins[index_join - 1].joinLayer().name()
-                        join_fieeld_name = vector_joins[index_join - 1].joinFieldName()
-                        target_field_name = vector_joins[index_join - 1].targetFieldName()
+        for layer in self.iter_layers(layer_filter):
+            if not isinstance(layer, QgsVectorLayer):
+                yield [layer.id(), layer.name(), layer.providerType(), layer.metadata().abstract(),
+                       get_url(layer), self.crs_cache.description(layer.crs())] # comment
 
-                        self.layer_joins_data.append([index_join, layer_index, layer_name, join_layer,
-                                                      join_fieeld_name, target_field_name])
+    def iter_raster_details(self, layer_filter=None):
+        """Yields the rows of the raster details section (bands, data type, resolution, extent, nodata value,
+        overviews and compression of the GDAL raster layers).
 
+        The datasets are opened concurrently, only once per data source, and the properties of the files that
+        have not changed since the last run are read from the raster cache file.
 
+        :param layer_filter: LayerFilter or function that receives a layer and returns True if it must be reported
+        :type layer_filter: LayerFilter or function
 
+        :returns: Generator of rows with the raster_details_column_names columns
+        """
 
-            else:
-                self.raster_layers_data.append(
-                    [index, layer_name, layer_storage, abstract, path_url, crs]) # comment
+        raster_layers = [layer for layer in self.iter_layers(layer_filter)
+                         if isinstance(layer, QgsRasterLayer) and layer.providerType() == 'gdal']
 
-        # Layouts
-        self.layouts = self.qgsproject.layoutManager().layouts()
+        # Layers on the same file share a dataset, even if their sources are written differently
+        layer_keys = {}
+        datasets = {}
+        for layer in raster_layers:
+            key, source, path = raster_dataset(layer)
+            layer_keys[layer.id()] = key
+            datasets.setdefault(key, (source, path))
 
-        self.layouts_column_names = ['id', 'layout_name', 'layout_type', 'atlas', 'atlas_coverageLayer_name']
-        self.layouts_data = []
+        cache = RasterProbeCache(self.raster_cache_file,
+                                 log=lambda message: QgsMessageLog.logMessage(message, 'Project Reports', Qgis.Warning))
+        details = probe_rasters(datasets, cache) if datasets else {}
+
+        for layer in raster_layers:
+            layer_details = details.get(layer_keys[layer.id()], {})
+            yield [layer.id(), layer.name(), layer.source()] + [
+                '' if layer_details.get(key) is None else layer_details[key] for key in RASTER_DETAILS_KEYS]
+
+    def iter_fields(self, layer_filter=None):
+        """Yields the rows of the fields section.
+
+        :param layer_filter: LayerFilter or function that receives a layer and returns True if it must be reported
+        :type layer_filter: LayerFilter or function
+
+        :returns: Generator of rows with the layer_fields_column_names columns
+        """
+
+        for layer in self.iter_layers(layer_filter):
+            if not isinstance(layer, QgsVectorLayer):
+                continue
+            layer_index = layer.id()
+            layer_name = layer.name()
+            for index_field, field in enumerate(layer.fields(), start=1):
+                field_name = field.name()
+                display_name = field.displayName()
+                alias = field.alias()
+                # comment = field.comment(),
+                type_name = field.typeName()
+                field_type = field.type()
+                length = field.length()
+                # precision = field.precision(),
+
+                yield [index_field, layer_index, layer_name, field_name, display_name, alias, type_name,
+                       field_type, length]
+
+    def iter_joins(self, layer_filter=None):
+        """Yields the rows of the joins section.
+
+        :param layer_filter: LayerFilter or function that receives a layer and returns True if it must be reported
+        :type layer_filter: LayerFilter or function
+
+        :returns: Generator of rows with the layer_joins_column_names columns
+        """
+
+        for layer in self.iter_layers(layer_filter):
+            if not isinstance(layer, QgsVectorLayer):
+                continue
+            layer_index = layer.id()
+            layer_name = layer.name()
+            for index_join, join in enumerate(layer.vectorJoins(), start=1):
+                join_layer_id = join.joinLayerId()
+                join_layer = join.joinLayer().name()
+                join_field_name = join.joinFieldName()
+                target_field_name = join.targetFieldName()
+
+                yield [index_join, layer_index, layer_name, join_layer_id, join_layer, join_field_name,
+                       target_field_name]
+
+    def iter_layouts(self, layer_filter=None):
+        """Yields the rows of the layouts section.
+
+        :param layer_filter: Not used, layouts are not filtered by layer
+        :type layer_filter: function
+
+        :returns: Generator of rows with the layouts_column_names columns
+        """
 
         dict_type_layouts = {0: "PrintLayout", 1: "Report", }
 
@@ -317,16 +580,123 @@ class QProjectReport:
             # atlas_count = layout.atlas().count() if  layout.layoutType() == 0 else ''
             atlas_coverageLayer_name = layout.atlas().coverageLayer().name() if layout.layoutType() == 0 and atlas else ''
 
-            self.layouts_data.append([index, layout_name, layout_type, atlas, atlas_coverageLayer_name])
+            yield [index, layout_name, layout_type, atlas, atlas_coverageLayer_name]
 
-        # Check
-        self.check_project = False
-        self.check_vector_layers = False
-        self.check_raster_layers = False
-        self.check_layouts = False
-        self.check_fields = False
-        self.check_joins = False
-        self.check_relations = False
+    def iter_dependencies(self, layer_filter=None):
+        """Yields the rows of the dependencies section (edge list of the dependency graph).
+
+        :param layer_filter: LayerFilter or function that receives a layer and returns True if it must be reported
+        :type layer_filter: LayerFilter or function
+
+        :returns: Generator of rows with the dependencies_column_names columns
+        """
+
+        if layer_filter is None:
+            graph = self.dependency_graph
+        else:
+            graph = build_dependency_graph(self.qgsproject, list(self.iter_layers(layer_filter)))
+
+        yield from graph.rows()
+
+    def iter_section(self, section, layer_filter=None):
+        """Yields the rows of a section.
+
+        :param section: Section name (one of SECTIONS)
+        :type section: str
+
+        :param layer_filter: LayerFilter or function that receives a layer and returns True if it must be reported
+        :type layer_filter: LayerFilter or function
+
+        :returns: Generator of rows with the columns returned by column_names(section)
+        """
+
+        return getattr(self, 'iter_' + section)(layer_filter)
+
+    def column_names(self, section):
+        """Returns the column names of a section.
+
+        :param section: Section name (one of SECTIONS)
+        :type section: str
+
+        :returns: Column names
+        :rtype: list
+        """
+
+        return getattr(self, SECTION_COLUMN_NAMES[section])
+
+    def section_data(self, section):
+        """Returns the rows of a section in a list. They are collected only once.
+
+        :param section: Section name (one of SECTIONS)
+        :type section: str
+
+        :returns: Rows of the section
+        :rtype: list
+        """
+
+        if section not in self._sections_data:
+            self._sections_data[section] = list(self.iter_section(section))
+        return self._sections_data[section]
+
+    @property
+    def project_relations_data(self):
+        return self.section_data('relations')
+
+    @property
+    def vector_layers_data(self):
+        return self.section_data('vector_layers')
+
+    @property
+    def raster_layers_data(self):
+        return self.section_data('raster_layers')
+
+    @property
+    def layer_fields_data(self):
+        return self.section_data('fields')
+
+    @property
+    def layer_joins_data(self):
+        return self.section_data('joins')
+
+    @property
+    def layouts_data(self):
+        return self.section_data('layouts')
+
+    @property
+    def raster_details_data(self):
+        return self.section_data('raster_details')
+
+    @property
+    def dependencies_data(self):
+        return self.section_data('dependencies')
+
+    @property
+    def dependency_graph(self):
+        """Dependency graph of the project, built the first time it is accessed."""
+
+        if self._dependency_graph is None:
+            self._dependency_graph = build_dependency_graph(self.qgsproject, self.layers)
+        return self._dependency_graph
+
+    @property
+    def dependency_cycles(self):
+        return self.dependency_graph.find_cycles()
+
+    @property
+    def dependency_errors_data(self):
+        return self.dependency_graph.errors
+
+    @property
+    def timings(self):
+        """Time in seconds spent in the instrumented lookups of the report."""
+
+        return {'crs_lookup': self.crs_cache.elapsed}
+
+    def log_timings(self):
+        """Writes the timing of the CRS lookups to the QGIS message log."""
+
+        QgsMessageLog.logMessage(f'{self.project_name or "untitled_project"}: {self.crs_cache.timing()}',
+                                 'Project Reports', Qgis.Info)
 
     def scaffolding(self):
         """"Making folders structure"""
@@ -341,6 +711,8 @@ class QProjectReport:
             remove_outputfolders(self.html_directory)
             os.mkdir(self.csv_directory)
             os.mkdir(self.html_directory)
+            if os.path.exists(self.ndjson_directory):
+                remove_outputfolders(self.ndjson_directory)
             # print("Directory '% s' already exists" % self.report_directory)
 
     def create_csv_file(self, file_name, column_names, data, single_row=False):
@@ -369,9 +741,270 @@ class QProjectReport:
             else:
                 writer.writerows(data)
 
+    def create_ndjson_file(self, sections, file_name='project_report', compress=False, layer_filter=None):
+        """
+        Creates a JSON-lines (NDJSON) file with the rows of the given sections.
+
+        Each section starts with a schema record with its column names, followed by one record per row:
+
+            {"section": "fields", "type": "schema", "columns": ["id", "layer_id", ...]}
+            {"section": "fields", "type": "record", "data": {"id": 1, "layer_id": "roads_1a2b", ...}}
+
+        Records are written as soon as they are collected. The stream is flushed at the end of each
+        section and at least every NDJSON_FLUSH_INTERVAL seconds, so the file can be tailed while the
+        report is being generated without a (gzip sync) flush per record.
+
+        Parameters:
+            - sections (list): The names of the sections to be written (see SECTIONS).
+            - file_name (str): The name of the file to be created, without the file extension.
+            - compress (bool): Write a gzip compressed file (.ndjson.gz). Default is False.
+            - layer_filter (LayerFilter or function): Function that receives a layer and returns True if it must be
+              reported, or a LayerFilter.
+
+        Returns:
+            str: The path of the created file
+        """
+
+        os.makedirs(self.ndjson_directory, exist_ok=True)
+        ndjson_file = os.path.join(self.ndjson_directory, file_name + ('.ndjson.gz' if compress else '.ndjson'))
+
+        with (gzip.open(ndjson_file, 'wt', encoding='utf-8') if compress
+              else open(ndjson_file, mode='w', encoding='utf-8')) as stream:
+            last_flush = time.monotonic()
+            for section in sections:
+                column_names = self.column_names(section)
+                write_ndjson_record(stream, {'section': section, 'type': 'schema', 'columns': column_names})
+                # Rows already collected for the CSV or HTML files are reused instead of being read again
+                rows = self._sections_data[section] if layer_filter is None and section in self._sections_data \
+                    else self.iter_section(section, layer_filter)
+                for row in rows:
+                    write_ndjson_record(stream, {'section': section, 'type': 'record',
+                                                 'data': dict(zip(column_names, row))})
+                    if time.monotonic() - last_flush >= NDJSON_FLUSH_INTERVAL:
+                        stream.flush()
+                        last_flush = time.monotonic()
+                stream.flush()
+                last_flush = time.monotonic()
+
+        return ndjson_file
+
+    def bundle_path(self, archive_format='zip'):
+        """Returns the path of the report bundle, next to the report directory.
+
+        :param archive_format: 'zip' or 'tar.zst'
+        :type archive_format: str
+        """
+
+        return '{}.{}'.format(self.report_directory, archive_format)
+
+    def create_bundle(self, sections, archive_format='zip'):
+        """
+        Creates a single archive with the CSV files of the given sections, the DOT file of the dependencies,
+        the HTML report and a manifest.json file describing the sections. The files are streamed straight into
+        the archive, without temporary files. The archive is created next to the report directory
+        (<project name>.zip or <project name>.tar.zst).
+
+        The archive is written under a temporary name in the same directory and renamed when it is complete, so
+        a failed or canceled run never leaves a truncated archive in place of the previous one.
+
+        Parameters:
+            - sections (list): The names of the sections to be written (see SECTIONS).
+            - archive_format (str): 'zip' or 'tar.zst'. The tar.zst format needs the zstandard package.
+
+        Returns:
+            str: The path of the created archive
+        """
+
+        if archive_format not in BUNDLE_FORMATS:
+            raise ValueError('Unknown bundle format: {}'.format(archive_format))
+
+        if archive_format == 'tar.zst':
+            try:
+                import zstandard
+            except ImportError:
+                raise RuntimeError('The zstandard Python package is needed to create tar.zst bundles')
+
+        bundle_file = self.bundle_path(archive_format)
+        temp_file = '{}.{}.part'.format(bundle_file, uuid.uuid4().hex)
+        manifest = {'project': self.project_data[0],
+                    'project_file': os.path.join(self.project_file_path, self.project_file_name),
+                    'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                    'html': 'html/project_report.html',
+                    'sections': []}
+
+        try:
+            if archive_format == 'zip':
+                with zipfile.ZipFile(temp_file, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+                    def write_member(name, write):
+                        with archive.open(name, 'w') as member:
+                            stream = io.TextIOWrapper(member, encoding='utf-8', newline='')
+                            result = write(stream)
+                            stream.flush()
+                            stream.detach()
+                        return result
+
+                    self.write_bundle(write_member, sections, manifest)
+            else:
+                with open(temp_file, 'wb') as raw_file, \
+                        zstandard.ZstdCompressor().stream_writer(raw_file) as compressed_file, \
+                        tarfile.open(fileobj=compressed_file, mode='w|') as archive:
+                    def write_member(name, write):
+                        # tar members need their size in the header, so each one is built in memory
+                        buffer = io.BytesIO()
+                        stream = io.TextIOWrapper(buffer, encoding='utf-8', newline='')
+                        result = write(stream)
+                        stream.flush()
+                        stream.detach()
+                        member = tarfile.TarInfo(name)
+                        member.size = buffer.tell()
+                        member.mtime = time.time()
+                        buffer.seek(0)
+                        archive.addfile(member, buffer)
+                        return result
+
+                    self.write_bundle(write_member, sections, manifest)
+
+            os.replace(temp_file, bundle_file)
+        finally:
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+
+        return bundle_file
+
+    def write_bundle(self, write_member, sections, manifest):
+        """Writes the members of a report bundle.
+
+        :param write_member: Function that receives the member name and a function that writes its content
+            to a text stream
+        :type write_member: function
+
+        :param sections: Names of the sections to be written
+        :type sections: list
+
+        :param manifest: Manifest of the bundle, completed with the sections
+        :type manifest: dict
+        """
+
+        for section in sections:
+            column_names = self.column_names(section)
+            member_name = 'csv/{}.csv'.format(SECTION_FILE_NAMES[section])
+
+            def write_csv(stream):
+                writer = csv.writer(stream, delimiter=';', quotechar='"', quoting=csv.QUOTE_MINIMAL)
+                writer.writerow(column_names)
+                rows = 0
+                # The rows are kept for the HTML report of the bundle
+                for row in self.section_data(section):
+                    writer.writerow(row)
+                    rows += 1
+                return rows
+
+            manifest['sections'].append({'name': section,
+                                         'file': member_name,
+                                         'columns': column_names,
+                                         'rows': write_member(member_name, write_csv)})
+
+            if section == 'dependencies':
+                write_member('csv/{}.dot'.format(SECTION_FILE_NAMES[section]),
+                             lambda stream: stream.write(self.dependency_graph.to_dot()))
+
+        write_member('html/project_report.html',
+                     lambda stream: stream.write(self.html_report([s in sections for s in HTML_SECTIONS])))
+        write_member('manifest.json', lambda stream: json.dump(manifest, stream, indent=2, default=str))
+
+    def create_dot_file(self, file_name):
+        """
+        Creates a Graphviz DOT file with the dependency graph of the project.
+
+        Parameters:
+            - file_name (str): The name of the file to be created, without the file extension.
+
+        Returns:
+            None
+        """
+
+        dot_file = os.path.join(self.report_directory, self.csv_directory, file_name + '.dot')
+        self.dependency_graph.write_dot(dot_file)
+
+    def create_reports(self, sections, output_formats, compress=False, feedback=None, bundle_format='zip'):
+        """
+        Creates the folders structure and the report files of the given sections in the given formats.
+
+        Parameters:
+            - sections (list): The names of the sections to be reported (see SECTIONS).
+            - output_formats (list): The output formats to be created (see OUTPUT_FORMATS).
+            - compress (bool): Compress the NDJSON file with gzip. Default is False.
+            - feedback (QgsFeedback): Optional feedback object used to report progress and to cancel.
+            - bundle_format (str): Archive format of the bundle output, 'zip' or 'tar.zst'. Default is 'zip'.
+
+        Returns:
+            bool: False if the feedback was canceled before all the files were written, True otherwise
+        """
+
+        # The bundle is a single archive next to the report directory and does not need its folders
+        if any(output_format in output_formats for output_format in ('csv', 'html', 'ndjson')):
+            self.scaffolding()
+
+        steps = (len(sections) if 'csv' in output_formats else 0) + ('html' in output_formats) \
+            + ('ndjson' in output_formats) + ('bundle' in output_formats)
+        done = 0
+
+        def step(message):
+            nonlocal done
+            if feedback is None:
+                return True
+            if feedback.isCanceled():
+                return False
+            feedback.pushInfo(message)
+            feedback.setProgress(100 * done / max(steps, 1))
+            done += 1
+            return True
+
+        if 'csv' in output_formats:
+            for section in sections:
+                if not step('Writing CSV file of section {}'.format(section)):
+                    return False
+                csv_file_name = SECTION_FILE_NAMES[section]
+                # The rows are kept only if the HTML report or the bundle need them too
+                csv_rows = self.section_data(section) if 'html' in output_formats or 'bundle' in output_formats \
+                    else self.iter_section(section)
+                self.create_csv_file(csv_file_name, self.column_names(section), csv_rows)
+                if section == 'dependencies':
+                    self.create_dot_file(csv_file_name)
+
+        if 'html' in output_formats:
+            if not step('Writing HTML file'):
+                return False
+            self.create_html([section in sections for section in HTML_SECTIONS])
+
+        if 'ndjson' in output_formats:
+            if not step('Writing NDJSON file'):
+                return False
+            self.create_ndjson_file(sections, compress=compress)
+
+        if 'bundle' in output_formats:
+            if not step('Writing report bundle'):
+                return False
+            self.create_bundle(sections, archive_format=bundle_format)
+
+        if feedback is not None:
+            feedback.setProgress(100)
+
+        self.log_timings()
+
+        return True
+
     def create_html(self, check_objets):
         """Create HTML report file"""
 
+        html_file = os.path.join(self.report_directory, self.html_directory, 'project_report.html')
+
+        with open(html_file, 'w') as html_file:
+            html_file.write(self.html_report(check_objets))
+
+    def html_report(self, check_objets):
+        """Returns the HTML report of the checked sections (see HTML_SECTIONS for the order of check_objets)"""
+
         self.check_project = check_objets[0]
         self.check_vector_layers = check_objets[1]
         self.check_raster_layers = check_objets[2]
@@ -379,8 +1012,10 @@ class QProjectReport:
         self.check_layouts = check_objets[4]
         self.check_joins = check_objets[5]
         self.check_relations = check_objets[6]
+        # Sections added after the first versions are optional, so older check lists are still valid
+        self.check_dependencies = len(check_objets) > 7 and check_objets[7]
+        self.check_raster_details = len(check_objets) > 8 and check_objets[8]
 
-        html_file = os.path.join(self.report_directory, self.html_directory, 'project_report.html')
         html_title = self.project_data[0]
         html_string = """<html>
                         <head>{}</head>
@@ -393,6 +1028,10 @@ class QProjectReport:
         if self.check_raster_layers:
             html_string += create_table('<h2>Raster layers</h2>', self.raster_layers_column_names, self.raster_layers_data)
 
+        if self.check_raster_details:
+            html_string += create_table('<h2>Raster layers details</h2>', self.raster_details_column_names,
+                                        self.raster_details_data)
+
         if self.check_vector_layers:
             html_string += create_table('<h2>Vector layers</h2>', self.vector_layers_column_names, self.vector_layers_data)
 
@@ -401,31 +1040,46 @@ class QProjectReport:
 
         if self.check_joins:
             html_string += """<h2>Vector layers joins</h2>"""
+            layer_joins_data_grouped = group_by_layer(self.layer_joins_data)
             for vector_layer in self.vector_layers_data:
                 n_joins = vector_layer[9]
                 if n_joins > 0:
                     layer_id = vector_layer[0]
                     layer_name = vector_layer[1]
-                    layer_joins_data_filtered = filter(lambda c: c[1] == layer_id, self.layer_joins_data)
                     html_string += create_table('<h3><i>Layer: {}</i></h3>'.format(layer_name), self.layer_joins_column_names,
-                                                layer_joins_data_filtered)
+                                                layer_joins_data_grouped.get(layer_id, []))
 
         if self.check_fields:
             html_string += """<h2>Vector layers fields</h2>"""
+            layer_fields_data_grouped = group_by_layer(self.layer_fields_data)
             for vector_layer in self.vector_layers_data:
                 layer_id = vector_layer[0]
                 layer_name = vector_layer[1]
-                layer_fields_data_filtered = filter(lambda c: c[1] == layer_id, self.layer_fields_data)
                 html_string += create_table('<h3><i>Layer: {}</i><h3>'.format(layer_name), self.layer_fields_column_names,
-                                            layer_fields_data_filtered)
+                                            layer_fields_data_grouped.get(layer_id, []))
 
         if self.check_layouts:
             html_string += create_table('<h2>Layouts</h2>', self.layouts_column_names, self.layouts_data)
 
+        if self.check_dependencies:
+            # Expressions often contain <, > and &
+            html_string += create_table('<h2>Dependencies</h2>', self.dependencies_column_names,
+                                        [[html.escape(str(cell)) for cell in row] for row in self.dependencies_data])
+            dependency_cycles = self.dependency_cycles
+            if dependency_cycles:
+                html_string += create_table('<h3><i>Cycles</i></h3>', ['id', 'nodes'],
+                                            [[index, ' &rarr; '.join(html.escape(self.dependency_graph.label(node))
+                                                                     for node in cycle)]
+                                             for index, cycle in enumerate(dependency_cycles, start=1)])
+            if self.dependency_errors_data:
+                html_string += create_table('<h3><i>Expression errors</i></h3>',
+                                            self.dependency_errors_column_names,
+                                            [[html.escape(str(cell)) for cell in row]
+                                             for row in self.dependency_errors_data])
+
         html_string += """<footer> <p>Generated with "Project Reports" QGIS plugin by Patricio Soriano <a 
         href="https://sigdeletras.com/">@SIGdeletras</a></p> </footer> """
 
         html_string += "</body></html>"
 
-        with open(html_file, 'w') as html_file:
-            html_file.write(html_string)
+        return html_string
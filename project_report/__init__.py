@@ -22,6 +22,7 @@
  ***************************************************************************/
  This script initializes the plugin, making it known to QGIS.
 """
+import time
 
 
 # noinspection PyPep8Naming
@@ -32,5 +33,9 @@ def classFactory(iface):  # pylint: disable=invalid-name
     :type iface: QgsInterface
     """
     #
+    start = time.perf_counter()
     from .project_report import ProjectReport
-    return ProjectReport(iface)
+    plugin = ProjectReport(iface)
+    # initGui adds its own time and writes the total to the QGIS message log
+    plugin.startup_time = time.perf_counter() - start
+    return plugin
@@ -0,0 +1,463 @@
+from functools import lru_cache
+
+from qgis.core import QgsExpression, QgsExpressionNode, QgsFields, QgsVectorLayer
+
+# Expression functions with a "layer" argument (layer name or id)
+LAYER_FUNCTIONS = ('aggregate', 'get_feature', 'get_feature_by_id', 'layer_property', 'is_layer_visible',
+                   'overlay_contains', 'overlay_crosses', 'overlay_disjoint', 'overlay_equals',
+                   'overlay_intersects', 'overlay_touches', 'overlay_within', 'overlay_nearest')
+
+# Expression functions with a "relation" argument (relation id)
+RELATION_FUNCTIONS = ('relation_aggregate',)
+
+# Arguments of the layer and relation functions that are evaluated on the features of the target layer
+TARGET_ARGUMENTS = ('expression', 'filter')
+
+# Node types added after QGIS 3.0 (index operator in 3.6, between operator in 3.26), None on older versions
+NT_INDEX_OPERATOR = getattr(QgsExpressionNode, 'ntIndexOperator', None)
+NT_BETWEEN_OPERATOR = getattr(QgsExpressionNode, 'ntBetweenOperator', None)
+
+
+def child_nodes(node):
+    """Returns the child nodes of an expression node that is not a function call."""
+
+    node_type = node.nodeType()
+    if node_type == QgsExpressionNode.ntUnaryOperator:
+        return [node.operand()]
+    if node_type == QgsExpressionNode.ntBinaryOperator:
+        return [node.opLeft(), node.opRight()]
+    if node_type == QgsExpressionNode.ntInOperator:
+        return [node.node()] + node.list().list()
+    if NT_BETWEEN_OPERATOR is not None and node_type == NT_BETWEEN_OPERATOR:
+        return [node.node(), node.lowerBound(), node.higherBound()]
+    if NT_INDEX_OPERATOR is not None and node_type == NT_INDEX_OPERATOR:
+        return [node.container(), node.index()]
+    if node_type == QgsExpressionNode.ntCondition:
+        children = []
+        for condition in node.conditions():
+            children += [condition.whenExpression(), condition.thenExpression()]
+        return children + [node.elseExp()]
+    return []
+
+
+def function_arguments(node, function):
+    """Returns the (name, node) pairs of the arguments of a function call. Positional arguments are named after
+    the parameters of the function."""
+
+    if node.args() is None:
+        return []
+
+    nodes = node.args().list()
+    names = node.args().names()
+    parameters = [parameter.name() for parameter in function.parameters()]
+    arguments = []
+    for index, argument in enumerate(nodes):
+        if index < len(names) and names[index]:
+            name = names[index]
+        else:
+            name = parameters[index] if index < len(parameters) else ''
+        arguments.append((name.lower(), argument))
+    return arguments
+
+
+def literal_string(node):
+    """Returns the value of a string literal node, or None for any other node."""
+
+    if node is not None and node.nodeType() == QgsExpressionNode.ntLiteral and isinstance(node.value(), str):
+        return node.value()
+    return None
+
+
+def collect_references(node, columns, layers, relations):
+    """Collects the columns, layers and relations referenced by an expression node and its children.
+
+    Parameters:
+    node (QgsExpressionNode): the node
+    columns (set): the columns of the layer the node is evaluated on
+    layers (dict): layer name or id -> set of the columns of that layer used by the expression
+    relations (dict): relation id -> set of the columns of the referencing layer used by the expression
+    """
+
+    if node is None:
+        return
+
+    if node.nodeType() == QgsExpressionNode.ntColumnRef:
+        columns.add(node.name())
+        return
+
+    if node.nodeType() != QgsExpressionNode.ntFunction:
+        for child in child_nodes(node):
+            collect_references(child, columns, layers, relations)
+        return
+
+    function = QgsExpression.Functions()[node.fnIndex()]
+    function_name = function.name().lower()
+    arguments = function_arguments(node, function)
+
+    # Columns used by the expressions evaluated on another layer. They are discarded if the layer is not a literal
+    target_columns = None
+    if function_name in LAYER_FUNCTIONS or function_name in RELATION_FUNCTIONS:
+        targets = layers if function_name in LAYER_FUNCTIONS else relations
+        target = literal_string(dict(arguments).get('layer' if function_name in LAYER_FUNCTIONS else 'relation'))
+        target_columns = targets.setdefault(target, set()) if target else set()
+    elif function_name == 'attribute' and len(arguments) == 1 and literal_string(arguments[0][1]):
+        columns.add(literal_string(arguments[0][1]))
+
+    for name, argument in arguments:
+        if target_columns is not None and name in TARGET_ARGUMENTS:
+            collect_references(argument, target_columns, layers, relations)
+        else:
+            collect_references(argument, columns, layers, relations)
+
+
+@lru_cache(maxsize=None)
+def parse_expression(expression):
+    """Parses a QGIS expression once and returns the objects it references.
+
+    The references are read from the parsed expression tree, so function calls inside string
+    literals are ignored and the arguments can be positional or named (layer:='roads'). The
+    result is memoized per expression string, so the same expression used in several fields
+    or layers is only parsed once.
+
+    Parameters:
+    expression (str): the expression string
+
+    Returns:
+    tuple: (referenced columns, referenced layers, referenced relations, parser error) where the
+    columns are a tuple of field names of the layer of the expression, the layers and relations
+    are tuples of (layer name or id / relation id, tuple of the field names used on that layer)
+    and the error is an empty string if the expression is valid
+    """
+
+    qgs_expression = QgsExpression(expression)
+    if qgs_expression.hasParserError():
+        return (), (), (), qgs_expression.parserErrorString()
+
+    columns = set()
+    layers = {}
+    relations = {}
+    collect_references(qgs_expression.rootNode(), columns, layers, relations)
+
+    return (tuple(sorted(columns)),
+            tuple((layer, tuple(sorted(layer_columns))) for layer, layer_columns in sorted(layers.items())),
+            tuple((relation, tuple(sorted(relation_columns)))
+                  for relation, relation_columns in sorted(relations.items())),
+            '')
+
+
+def field_node(layer_id, field_name):
+    """Returns the graph node of a layer field."""
+
+    return '{}.{}'.format(layer_id, field_name)
+
+
+class DependencyGraph:
+    """Directed graph of the dependencies between layers and fields of a QGIS project.
+
+    An edge goes from the dependent object to the object it depends on (e.g. from a virtual
+    field to each field used in its expression). Nodes are keyed by layer id (layer nodes) or
+    layer id and field name (field nodes), so layers with the same name are not merged; their
+    names are only used as labels."""
+
+    def __init__(self):
+        """Class Constructor."""
+
+        self.edges = []
+        self.adjacency = {}
+        self.labels = {}
+        self.errors = []
+
+    def add_layer(self, layer_id, layer_name):
+        """Adds the label of a layer node and returns the node.
+
+        :param layer_id: Layer id
+        :type layer_id: str
+
+        :param layer_name: Layer name
+        :type layer_name: str
+        """
+
+        self.labels[layer_id] = layer_name
+        return layer_id
+
+    def add_field(self, layer_id, layer_name, field_name):
+        """Adds the label of a field node and returns the node.
+
+        :param layer_id: Layer id
+        :type layer_id: str
+
+        :param layer_name: Layer name
+        :type layer_name: str
+
+        :param field_name: Field name
+        :type field_name: str
+        """
+
+        node = field_node(layer_id, field_name)
+        self.labels[node] = '{}.{}'.format(layer_name, field_name)
+        return node
+
+    def label(self, node):
+        """Returns the label (layer name or layer name and field name) of a node."""
+
+        return self.labels.get(node, node)
+
+    def add_edge(self, layer_id, source, target, kind, expression=''):
+        """Adds an edge to the graph.
+
+        :param layer_id: Id of the layer where the dependency is defined
+        :type layer_id: str
+
+        :param source: Dependent node
+        :type source: str
+
+        :param target: Node the source depends on
+        :type target: str
+
+        :param kind: Kind of dependency (virtual_field, default_value, constraint, widget, relation, join)
+        :type kind: str
+
+        :param expression: Expression or definition that creates the dependency
+        :type expression: str
+        """
+
+        self.edges.append((layer_id, source, target, kind, expression))
+        self.adjacency.setdefault(source, set()).add(target)
+        self.adjacency.setdefault(target, set())
+
+    def add_expression(self, layer_id, source, kind, expression, resolve_layer, resolve_relation):
+        """Adds one edge for every field, layer and relation referenced by an expression.
+
+        The fields used in the expressions evaluated on another layer (e.g. the expression of an
+        aggregate) are linked to the fields of that layer.
+
+        :param layer_id: Id of the layer where the expression is defined
+        :type layer_id: str
+
+        :param source: Dependent node
+        :type source: str
+
+        :param kind: Kind of dependency
+        :type kind: str
+
+        :param expression: Expression string
+        :type expression: str
+
+        :param resolve_layer: Function returning the (id, name) of a layer from its name or id
+        :type resolve_layer: function
+
+        :param resolve_relation: Function returning the (id, name) of the referencing layer of a relation id
+        :type resolve_relation: function
+        """
+
+        if not expression:
+            return
+
+        columns, layers, relations, error = parse_expression(expression)
+        if error:
+            self.errors.append([self.label(layer_id), self.label(source), kind, expression, error])
+            return
+
+        for column in columns:
+            self.add_edge(layer_id, source, self.add_field(layer_id, self.label(layer_id), column), kind, expression)
+
+        targets = [(resolve_layer(layer), layer_columns) for layer, layer_columns in layers] + \
+                  [(resolve_relation(relation), relation_columns) for relation, relation_columns in relations]
+        for (target_id, target_name), target_columns in targets:
+            self.add_edge(layer_id, source, self.add_layer(target_id, target_name), kind, expression)
+            for column in target_columns:
+                self.add_edge(layer_id, source, self.add_field(target_id, target_name, column), kind, expression)
+
+    def find_cycles(self):
+        """Finds the dependency cycles of the graph (Tarjan's strongly connected components).
+
+        Returns:
+        list: a list of cycles, each one a sorted list of node names
+        """
+
+        index_counter = 0
+        indexes = {}
+        lowlinks = {}
+        stack = []
+        on_stack = set()
+        cycles = []
+
+        for root in self.adjacency:
+            if root in indexes:
+                continue
+
+            work = [(root, iter(sorted(self.adjacency[root])))]
+            indexes[root] = lowlinks[root] = index_counter
+            index_counter += 1
+            stack.append(root)
+            on_stack.add(root)
+
+            while work:
+                node, children = work[-1]
+                child = next(children, None)
+
+                if child is not None:
+                    if child not in indexes:
+                        indexes[child] = lowlinks[child] = index_counter
+                        index_counter += 1
+                        stack.append(child)
+                        on_stack.add(child)
+                        work.append((child, iter(sorted(self.adjacency[child]))))
+                    elif child in on_stack:
+                        lowlinks[node] = min(lowlinks[node], indexes[child])
+                    continue
+
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlinks[parent] = min(lowlinks[parent], lowlinks[node])
+
+                if lowlinks[node] == indexes[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    if len(component) > 1 or node in self.adjacency[node]:
+                        cycles.append(sorted(component))
+
+        return cycles
+
+    def rows(self):
+        """Returns the edge list as report rows.
+
+        Returns:
+        list: a list of [id, layer_id, layer, source_id, source, target_id, target, kind, expression, in_cycle] rows
+        """
+
+        cycle_nodes = {}
+        for index_cycle, cycle in enumerate(self.find_cycles(), start=1):
+            for node in cycle:
+                cycle_nodes[node] = index_cycle
+
+        rows = []
+        for index_edge, (layer_id, source, target, kind, expression) in enumerate(self.edges, start=1):
+            in_cycle = source in cycle_nodes and cycle_nodes.get(source) == cycle_nodes.get(target)
+            rows.append([index_edge, layer_id, self.label(layer_id), source, self.label(source), target,
+                         self.label(target), kind, expression, in_cycle])
+
+        return rows
+
+    def to_dot(self):
+        """Returns the graph in Graphviz DOT format. Edges that are part of a cycle are drawn in red.
+
+        Returns:
+        str: the DOT document
+        """
+
+        def quote(value):
+            return '"{}"'.format(str(value).replace('\\', '\\\\').replace('"', '\\"'))
+
+        dot = ['digraph dependencies {', '  rankdir=LR;', '  node [shape=box];']
+        for node in self.adjacency:
+            dot.append('  {} [label={}];'.format(quote(node), quote(self.label(node))))
+        for row in self.rows():
+            source, target, kind, in_cycle = row[3], row[5], row[7], row[9]
+            color = ', color=red' if in_cycle else ''
+            dot.append('  {} -> {} [label={}{}];'.format(quote(source), quote(target), quote(kind), color))
+        dot.append('}')
+
+        return '\n'.join(dot)
+
+    def write_dot(self, file_path):
+        """Writes the graph to a Graphviz DOT file.
+
+        :param file_path: Path of the DOT file
+        :type file_path: str
+        """
+
+        with open(file_path, mode='w', encoding='utf-8') as dot_file:
+            dot_file.write(self.to_dot())
+
+
+def build_dependency_graph(qgsproject, layers):
+    """Builds the dependency graph of the virtual fields, default values, constraints, widgets,
+    relations and joins of the given layers.
+
+    Parameters:
+    qgsproject (QgsProject): the QGIS project
+    layers (list): the layers to inspect
+
+    Returns:
+    DependencyGraph: the dependency graph
+    """
+
+    graph = DependencyGraph()
+    relations = qgsproject.relationManager().relations()
+
+    def resolve_layer(reference):
+        layer = qgsproject.mapLayer(reference)
+        if layer is None:
+            matches = qgsproject.mapLayersByName(reference)
+            layer = matches[0] if matches else None
+        return (layer.id(), layer.name()) if layer is not None else (reference, reference)
+
+    def resolve_relation(relation_id):
+        relation = relations.get(relation_id)
+        if relation is None or relation.referencingLayer() is None:
+            return relation_id, relation_id
+        return relation.referencingLayer().id(), relation.referencingLayer().name()
+
+    for layer in layers:
+        if not isinstance(layer, QgsVectorLayer):
+            continue
+
+        layer_id = graph.add_layer(layer.id(), layer.name())
+        fields = layer.fields()
+
+        for index_field, field in enumerate(fields):
+            source = graph.add_field(layer_id, layer.name(), field.name())
+
+            if fields.fieldOrigin(index_field) == QgsFields.OriginExpression:
+                graph.add_expression(layer_id, source, 'virtual_field', layer.expressionField(index_field),
+                                     resolve_layer, resolve_relation)
+
+            graph.add_expression(layer_id, source, 'default_value', field.defaultValueDefinition().expression(),
+                                 resolve_layer, resolve_relation)
+            graph.add_expression(layer_id, source, 'constraint', field.constraints().constraintExpression(),
+                                 resolve_layer, resolve_relation)
+
+            widget_setup = field.editorWidgetSetup()
+            widget_config = widget_setup.config() or {}
+            if widget_setup.type() == 'ValueRelation':
+                value_layer_id, value_layer_name = resolve_layer(widget_config.get('Layer', '')
+                                                                 or widget_config.get('LayerName', ''))
+                graph.add_edge(layer_id, source,
+                               graph.add_field(value_layer_id, value_layer_name, widget_config.get('Key', '')),
+                               'widget', 'ValueRelation')
+                graph.add_expression(layer_id, source, 'widget', widget_config.get('FilterExpression', ''),
+                                     resolve_layer, resolve_relation)
+            elif widget_setup.type() == 'RelationReference':
+                relation = relations.get(widget_config.get('Relation', ''))
+                if relation is not None and relation.referencedLayer() is not None:
+                    referenced_layer = relation.referencedLayer()
+                    graph.add_edge(layer_id, source, graph.add_layer(referenced_layer.id(), referenced_layer.name()),
+                                   'widget', 'RelationReference')
+
+        for join in layer.vectorJoins():
+            join_layer = join.joinLayer()
+            join_layer_id, join_layer_name = (join_layer.id(), join_layer.name()) if join_layer is not None \
+                else (join.joinLayerId(), join.joinLayerId())
+            graph.add_edge(layer_id, graph.add_field(layer_id, layer.name(), join.targetFieldName()),
+                           graph.add_field(join_layer_id, join_layer_name, join.joinFieldName()), 'join')
+
+    layer_ids = {layer.id() for layer in layers}
+    for relation in relations.values():
+        referencing_layer = relation.referencingLayer()
+        referenced_layer = relation.referencedLayer()
+        if referencing_layer is None or referenced_layer is None or referencing_layer.id() not in layer_ids:
+            continue
+        for referencing_field, referenced_field in relation.fieldPairs().items():
+            graph.add_edge(referencing_layer.id(),
+                           graph.add_field(referencing_layer.id(), referencing_layer.name(), referencing_field),
+                           graph.add_field(referenced_layer.id(), referenced_layer.name(), referenced_field),
+                           'relation', relation.name())
+
+    return graph
@@ -0,0 +1,157 @@
+from fnmatch import fnmatchcase
+
+from qgis.core import QgsVectorLayer
+
+from .sections import CRITERIA
+
+
+def split_patterns(text):
+    """Returns the list of patterns of a comma separated string.
+
+    Parameters:
+    text (str): comma separated patterns (e.g. "roads_*, rivers")
+
+    Returns:
+    list: the patterns, without empty ones
+    """
+
+    return [pattern.strip() for pattern in (text or '').split(',') if pattern.strip()]
+
+
+def matches(value, patterns):
+    """Returns True if the value matches any of the patterns (case insensitive, * and ? wildcards).
+
+    Parameters:
+    value (str or list): the value or the list of values to check
+    patterns (list): the patterns
+
+    Returns:
+    bool
+    """
+
+    values = value if isinstance(value, (list, tuple)) else [value]
+    return any(fnmatchcase((v or '').lower(), pattern.lower()) for v in values for pattern in patterns)
+
+
+def layer_groups(qgsproject):
+    """Returns the names of the groups that contain each layer of the layer tree.
+
+    Parameters:
+    qgsproject (QgsProject): the QGIS project
+
+    Returns:
+    dict: a dictionary with the layer ids as keys and the lists of group names (all the ancestors) as values
+    """
+
+    groups = {}
+    root = qgsproject.layerTreeRoot()
+    for tree_layer in root.findLayers():
+        names = []
+        parent = tree_layer.parent()
+        while parent is not None and parent != root:
+            names.append(parent.name())
+            parent = parent.parent()
+        groups[tree_layer.layerId()] = names
+    return groups
+
+
+def select_layers(qgsproject, layers, layer_filter):
+    """Returns the layers selected by a layer filter, keeping their order.
+
+    Parameters:
+    qgsproject (QgsProject): the QGIS project of the layers
+    layers (iterable): the layers to be filtered
+    layer_filter (LayerFilter or function): a LayerFilter, or a function that receives a layer and returns True
+        if it must be reported. None selects all the layers.
+
+    Returns:
+    list: the selected layers
+    """
+
+    if layer_filter is None:
+        return list(layers)
+    if isinstance(layer_filter, LayerFilter):
+        return layer_filter.filter_layers(qgsproject, layers)
+    return [layer for layer in layers if layer_filter(layer)]
+
+
+class LayerFilter:
+    """Selection of the layers to be reported, by name, provider type, group and storage type, with optional
+    sampling of the selected layers.
+
+    The filter is applied before any data provider call, so the excluded layers are not read at all. The storage
+    type, which is the only criterion that needs the data provider, is checked last."""
+
+    def __init__(self, include=None, exclude=None, sample=0):
+        """Class Constructor.
+
+        :param include: Patterns of the layers to be included for each criterion (name, provider, group and/or
+            storage), e.g. {'name': ['roads_*'], 'provider': ['postgres']}. A layer must match all the criteria.
+        :type include: dict
+
+        :param exclude: Patterns of the layers to be excluded for each criterion. A layer is excluded if it
+            matches any of them.
+        :type exclude: dict
+
+        :param sample: Maximum number of layers to report, evenly spread over the selected layers (0 for all)
+        :type sample: int
+        """
+
+        self.include = {criterion: list(patterns) for criterion, patterns in (include or {}).items() if patterns}
+        self.exclude = {criterion: list(patterns) for criterion, patterns in (exclude or {}).items() if patterns}
+        self.sample = sample or 0
+
+        for criterion in list(self.include) + list(self.exclude):
+            if criterion not in CRITERIA:
+                raise ValueError('Unknown layer filter criterion: {}'.format(criterion))
+
+    def is_empty(self):
+        """Returns True if the filter selects all the layers."""
+
+        return not self.include and not self.exclude and not self.sample
+
+    def filter_layers(self, qgsproject, layers):
+        """Returns the layers selected by the filter, keeping their order.
+
+        :param qgsproject: QGIS project of the layers
+        :type qgsproject: QgsProject object
+
+        :param layers: Layers to be filtered
+        :type layers: list
+
+        :returns: Selected layers
+        :rtype: list
+        """
+
+        layers = list(layers)
+        if self.is_empty():
+            return layers
+
+        groups = layer_groups(qgsproject) if 'group' in self.include or 'group' in self.exclude else {}
+
+        values = {
+            'name': lambda layer: layer.name(),
+            'provider': lambda layer: layer.providerType(),
+            'group': lambda layer: groups.get(layer.id(), []),
+            'storage': lambda layer: layer.dataProvider().storageType() if isinstance(layer, QgsVectorLayer)
+            else layer.providerType(),
+        }
+
+        selected = []
+        for layer in layers:
+            accepted = True
+            for criterion in CRITERIA:
+                if criterion in self.include and not matches(values[criterion](layer), self.include[criterion]):
+                    accepted = False
+                    break
+                if criterion in self.exclude and matches(values[criterion](layer), self.exclude[criterion]):
+                    accepted = False
+                    break
+            if accepted:
+                selected.append(layer)
+
+        if self.sample and len(selected) > self.sample:
+            step = len(selected) / self.sample
+            selected = [selected[int(i * step)] for i in range(self.sample)]
+
+        return selected
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ GenerateReportAlgorithm
+                                 A QGIS plugin
+ Processing algorithm that generates the report of a QGIS project
+                             -------------------
+        copyright            : (C) 2023 by Patricio Soriano. SIGdeletras.com
+        email                : pasoriano@gmail.com
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+"""
+
+import os
+
+from qgis.PyQt.QtCore import QCoreApplication
+from qgis.core import (QgsProcessingAlgorithm,
+                       QgsProcessingException,
+                       QgsProcessingParameterBoolean,
+                       QgsProcessingParameterEnum,
+                       QgsProcessingParameterFile,
+                       QgsProcessingParameterDefinition,
+                       QgsProcessingParameterFolderDestination,
+                       QgsProcessingParameterNumber,
+                       QgsProcessingParameterString,
+                       QgsProcessingOutputFolder,
+                       QgsProject)
+
+# Only the names of the sections are imported here. The algorithm is loaded with the provider at QGIS startup, so
+# the report modules are imported when the algorithm is run
+from ..sections import BUNDLE_FORMATS, CRITERIA, OUTPUT_FORMATS, SECTIONS
+
+
+class GenerateReportAlgorithm(QgsProcessingAlgorithm):
+    """Generates the report (CSV, HTML and/or NDJSON files) of the current project or of a project file."""
+
+    PROJECT_FILE = 'PROJECT_FILE'
+    SECTIONS = 'SECTIONS'
+    OUTPUT_FORMATS = 'OUTPUT_FORMATS'
+    COMPRESS = 'COMPRESS'
+    BUNDLE_FORMAT = 'BUNDLE_FORMAT'
+    SAMPLE = 'SAMPLE'
+    OUTPUT_FOLDER = 'OUTPUT_FOLDER'
+    REPORT_DIRECTORY = 'REPORT_DIRECTORY'
+
+    def tr(self, string):
+        return QCoreApplication.translate('Processing', string)
+
+    def createInstance(self):
+        return GenerateReportAlgorithm()
+
+    def name(self):
+        return 'generateprojectreport'
+
+    def displayName(self):
+        return self.tr('Generate project report')
+
+    def shortHelpString(self):
+        return self.tr('Generates the report of properties and metadata about layers, fields and layouts of a '
+                       'QGIS project. If no project file is given, the current project is reported.')
+
+    def flags(self):
+        # The layers of the project are read, which is not safe outside the main thread
+        return super().flags() | QgsProcessingAlgorithm.FlagNoThreading
+
+    def initAlgorithm(self, config=None):
+        self.addParameter(QgsProcessingParameterFile(self.PROJECT_FILE,
+                                                     self.tr('Project file (current project if empty)'),
+                                                     behavior=QgsProcessingParameterFile.File,
+                                                     fileFilter='QGIS files (*.qgs *.qgz)',
+                                                     optional=True))
+        self.addParameter(QgsProcessingParameterEnum(self.SECTIONS,
+                                                     self.tr('Objects'),
+                                                     options=[section.replace('_', ' ').capitalize()
+                                                              for section in SECTIONS],
+                                                     allowMultiple=True,
+                                                     defaultValue=list(range(len(SECTIONS)))))
+        self.addParameter(QgsProcessingParameterEnum(self.OUTPUT_FORMATS,
+                                                     self.tr('Output formats'),
+                                                     options=[output_format.upper() for output_format in OUTPUT_FORMATS],
+                                                     allowMultiple=True,
+                                                     defaultValue=[0, 1]))
+        self.addParameter(QgsProcessingParameterBoolean(self.COMPRESS,
+                                                        self.tr('Compress NDJSON file (gzip)'),
+                                                        defaultValue=False))
+        self.addParameter(QgsProcessingParameterEnum(self.BUNDLE_FORMAT,
+                                                     self.tr('Bundle archive format'),
+                                                     options=BUNDLE_FORMATS,
+                                                     defaultValue=0))
+        for criterion in CRITERIA:
+            for mode in ('include', 'exclude'):
+                parameter = QgsProcessingParameterString('{}_{}'.format(mode, criterion).upper(),
+                                                         self.tr('{} layers by {} (comma separated patterns)').format(
+                                                             mode.capitalize(), criterion),
+                                                         optional=True)
+                parameter.setFlags(parameter.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+                self.addParameter(parameter)
+        parameter = QgsProcessingParameterNumber(self.SAMPLE,
+                                                 self.tr('Sample N layers (0 for all)'),
+                                                 type=QgsProcessingParameterNumber.Integer,
+                                                 minValue=0,
+                                                 defaultValue=0)
+        parameter.setFlags(parameter.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(parameter)
+        self.addParameter(QgsProcessingParameterFolderDestination(self.OUTPUT_FOLDER,
+                                                                  self.tr('Output directory')))
+        self.addOutput(QgsProcessingOutputFolder(self.REPORT_DIRECTORY, self.tr('Report directory')))
+
+    def processAlgorithm(self, parameters, context, feedback):
+        from ..QProjectReport import QProjectReport
+        from ..layer_filter import LayerFilter, split_patterns
+
+        project_file = self.parameterAsFile(parameters, self.PROJECT_FILE, context)
+        sections = [SECTIONS[i] for i in sorted(self.parameterAsEnums(parameters, self.SECTIONS, context))]
+        output_formats = [OUTPUT_FORMATS[i] for i in self.parameterAsEnums(parameters, self.OUTPUT_FORMATS, context)]
+        compress = self.parameterAsBoolean(parameters, self.COMPRESS, context)
+        bundle_format = BUNDLE_FORMATS[self.parameterAsEnum(parameters, self.BUNDLE_FORMAT, context)]
+        output_folder = self.parameterAsFileOutput(parameters, self.OUTPUT_FOLDER, context)
+        layer_filter = LayerFilter(
+            include={criterion: split_patterns(self.parameterAsString(parameters, 'INCLUDE_' + criterion.upper(),
+                                                                      context))
+                     for criterion in CRITERIA},
+            exclude={criterion: split_patterns(self.parameterAsString(parameters, 'EXCLUDE_' + criterion.upper(),
+                                                                      context))
+                     for criterion in CRITERIA},
+            sample=self.parameterAsInt(parameters, self.SAMPLE, context))
+
+        if not sections or not output_formats:
+            raise QgsProcessingException(self.tr('At least one object and one type of output must be indicated'))
+
+        if project_file:
+            qgsproject = QgsProject()
+            if not qgsproject.read(project_file):
+                raise QgsProcessingException(self.tr('The project file {} could not be read').format(project_file))
+        else:
+            qgsproject = context.project()
+            if qgsproject is None:
+                raise QgsProcessingException(self.tr('There is no current project, a project file must be indicated'))
+
+        # New folders (command line, batch rows, temporary outputs) are not created by Processing
+        os.makedirs(output_folder, exist_ok=True)
+
+        report = QProjectReport(qgsproject, output_folder, layer_filter)
+        feedback.pushInfo(self.tr('{} of {} layers selected').format(len(report.layers), qgsproject.count()))
+        try:
+            completed = report.create_reports(sections, output_formats, compress=compress, feedback=feedback,
+                                              bundle_format=bundle_format)
+        except RuntimeError as e:
+            raise QgsProcessingException(str(e))
+
+        # A partial report must not be passed on to the next steps of a batch or a model
+        if not completed or feedback.isCanceled():
+            raise QgsProcessingException(self.tr('The report generation was canceled'))
+
+        return {self.OUTPUT_FOLDER: output_folder, self.REPORT_DIRECTORY: report.report_directory}
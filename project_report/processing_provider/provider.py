@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ ProjectReportProvider
+                                 A QGIS plugin
+ Processing provider with the Project Reports algorithms
+                             -------------------
+        copyright            : (C) 2023 by Patricio Soriano. SIGdeletras.com
+        email                : pasoriano@gmail.com
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+"""
+
+import os
+
+from qgis.PyQt.QtGui import QIcon
+from qgis.core import QgsProcessingProvider
+
+
+class ProjectReportProvider(QgsProcessingProvider):
+    """Processing provider of the Project Reports plugin."""
+
+    def loadAlgorithms(self):
+        """Loads the algorithms of the provider."""
+        from .generate_report_algorithm import GenerateReportAlgorithm
+
+        self.addAlgorithm(GenerateReportAlgorithm())
+
+    def id(self):
+        return 'projectreport'
+
+    def name(self):
+        return 'Project Reports'
+
+    def icon(self):
+        return QIcon(os.path.join(os.path.dirname(os.path.dirname(__file__)), 'icon.png'))
+
+    def longName(self):
+        return self.name()
@@ -24,9 +24,11 @@
 from qgis.PyQt.QtCore import QSettings, QTranslator, QCoreApplication, Qt
 from qgis.PyQt.QtGui import QIcon
 from qgis.PyQt.QtWidgets import QAction
+from qgis.core import Qgis, QgsApplication, QgsMessageLog
+from qgis.utils import pluginMetadata
 
-from .project_report_dockwidget import ProjectReportDockWidget
 import os.path
+import time
 
 
 class ProjectReport:
@@ -37,7 +39,8 @@ class ProjectReport:
 
         :param iface: An interface instance that will be passed to this class
             which provides the hook by which you can manipulate the QGIS
-            application at run time.
+            application at run time. It is None when the plugin is loaded
+            by qgis_process, which only calls initProcessing.
         :type iface: QgsInterface
         """
         # Save reference to the QGIS interface
@@ -47,7 +50,7 @@ class ProjectReport:
         self.plugin_dir = os.path.dirname(__file__)
 
         # initialize locale
-        locale = QSettings().value('locale/userLocale')[0:2]
+        locale = (QSettings().value('locale/userLocale') or '')[0:2]
         locale_path = os.path.join(
             self.plugin_dir,
             'i18n',
@@ -61,14 +64,16 @@ class ProjectReport:
         # Declare instance attributes
         self.actions = []
         self.menu = self.tr(u'&Project Reports')
-        # TODO: We are going to let the user set this up in a future iteration
-        self.toolbar = self.iface.addToolBar(u'Project Reports')
-        self.toolbar.setObjectName(u'Project Reports')
+        # The toolbar is created in initGui, as there is no interface under qgis_process
+        self.toolbar = None
 
         #print "** INITIALIZING ProjectReport"
 
         self.pluginIsActive = False
         self.dockwidget = None
+        self.provider = None
+        # Seconds spent importing and initializing the plugin at QGIS startup (see classFactory)
+        self.startup_time = 0.0
 
 
     # noinspection PyMethodMayBeStatic
@@ -161,9 +166,27 @@ class ProjectReport:
         return action
 
 
+    def initProcessing(self):
+        """Register the Processing provider with the plugin algorithms."""
+
+        # The provider is imported here so that the plugin module stays light; the report code is only imported
+        # when an algorithm is run or the dock is opened
+        from .processing_provider.provider import ProjectReportProvider
+
+        self.provider = ProjectReportProvider()
+        QgsApplication.processingRegistry().addProvider(self.provider)
+
     def initGui(self):
         """Create the menu entries and toolbar icons inside the QGIS GUI."""
 
+        start = time.perf_counter()
+
+        # TODO: We are going to let the user set this up in a future iteration
+        self.toolbar = self.iface.addToolBar(u'Project Reports')
+        self.toolbar.setObjectName(u'Project Reports')
+
+        self.initProcessing()
+
         #icon_path = ':/plugins/pProject_report/icon.png'
 
         # icon_path = self.plugin_dir + 'icon.png'
@@ -175,6 +198,17 @@ class ProjectReport:
             callback=self.run,
             parent=self.iface.mainWindow())
 
+        self.startup_time += time.perf_counter() - start
+        self.log_startup_time()
+
+    def log_startup_time(self):
+        """Write the time added by the plugin to the QGIS startup to the QGIS message log."""
+
+        version = pluginMetadata(os.path.basename(self.plugin_dir), 'version')
+        QgsMessageLog.logMessage(
+            'Project Reports {} startup time: {:.1f} ms'.format(version, self.startup_time * 1000),
+            'Project Reports', Qgis.Info)
+
     #--------------------------------------------------------------------------
 
     def onClosePlugin(self):
@@ -205,7 +239,10 @@ class ProjectReport:
                 action)
             self.iface.removeToolBarIcon(action)
         # remove the toolbar
-        del self.toolbar
+        self.toolbar = None
+
+        if self.provider is not None:
+            QgsApplication.processingRegistry().removeProvider(self.provider)
 
     #--------------------------------------------------------------------------
 
@@ -221,6 +258,9 @@ class ProjectReport:
             #    first run of plugin
             #    removed on close (see self.onClosePlugin method)
             if self.dockwidget == None:
+                # The dock module (and its .ui file) is only loaded the first time the plugin is opened
+                from .project_report_dockwidget import ProjectReportDockWidget
+
                 # Create the dockwidget (after translation) and keep reference
                 self.dockwidget = ProjectReportDockWidget(self.iface)
 
@@ -23,33 +23,26 @@
 """
 
 import os
-import shutil
 
-from qgis.PyQt import QtGui, QtWidgets, uic
+from qgis.PyQt import QtWidgets, uic
 from qgis.PyQt.QtCore import pyqtSignal
-from qgis._core import Qgis
+from qgis.PyQt.QtWidgets import QMessageBox
 
-from qgis.core import QgsProject, QgsVectorLayer, QgsWkbTypes, QgsRasterLayer
+from qgis.core import Qgis, QgsProject
 
-from .QProjectReport import QProjectReport
+from .QProjectReport import QProjectReport, SECTIONS
+from .layer_filter import LayerFilter, split_patterns
 
-from PyQt5.QtWidgets import QMessageBox, QLabel
+UI_FILE = os.path.join(os.path.dirname(__file__), 'project_report_dockwidget_base.ui')
 
-from qgis.gui import (
-    QgsMessageBar,
-)
 
-FORM_CLASS, _ = uic.loadUiType(os.path.join(
-    os.path.dirname(__file__), 'project_report_dockwidget_base.ui'))
-
-
-class ProjectReportDockWidget(QtWidgets.QDockWidget, FORM_CLASS):
+class ProjectReportDockWidget(QtWidgets.QDockWidget):
     closingPlugin = pyqtSignal()
 
     def __init__(self, iface, parent=None):
-        """Constructor."""
+        """Constructor. The .ui file is loaded here, when the dock is first shown, instead of at import time."""
         super(ProjectReportDockWidget, self).__init__(parent)
-        self.setupUi(self)
+        uic.loadUi(UI_FILE, self)
 
         self.iface = iface
 
@@ -62,6 +55,10 @@ class ProjectReportDockWidget(QtWidgets.QDockWidget, FORM_CLASS):
 
         self.check_csv.setChecked(False)
         self.check_html.setChecked(False)
+        self.check_ndjson.setChecked(False)
+        self.check_ndjson_gzip.setChecked(False)
+        self.check_ndjson_gzip.setEnabled(False)
+        self.check_bundle.setChecked(False)
 
         self.check_project.setChecked(False)
         self.check_vector_layers.setChecked(False)
@@ -70,9 +67,14 @@ class ProjectReportDockWidget(QtWidgets.QDockWidget, FORM_CLASS):
         self.check_fields.setChecked(False)
         self.check_joins.setChecked(False)
         self.check_relations.setChecked(False)
+        self.check_dependencies.setChecked(False)
+        self.check_raster_details.setChecked(False)
 
         self.check_csv.toggled.connect(self.check_options)
         self.check_html.toggled.connect(self.check_options)
+        self.check_ndjson.toggled.connect(self.check_options)
+        self.check_ndjson.toggled.connect(self.check_ndjson_gzip.setEnabled)
+        self.check_bundle.toggled.connect(self.check_options)
 
         self.check_project.clicked.connect(self.check_options)
         self.check_vector_layers.toggled.connect(self.check_options)
@@ -81,10 +83,14 @@ class ProjectReportDockWidget(QtWidgets.QDockWidget, FORM_CLASS):
         self.check_fields.toggled.connect(self.check_options)
         self.check_joins.clicked.connect(self.check_options)
         self.check_relations.clicked.connect(self.check_options)
+        self.check_dependencies.clicked.connect(self.check_options)
+        self.check_raster_details.clicked.connect(self.check_options)
 
         self.options_outputs = [
             self.check_csv.isChecked(),
             self.check_html.isChecked(),
+            self.check_ndjson.isChecked(),
+            self.check_bundle.isChecked(),
         ]
 
         self.options_objets = [
@@ -95,6 +101,8 @@ class ProjectReportDockWidget(QtWidgets.QDockWidget, FORM_CLASS):
             self.check_fields.isChecked(),
             self.check_relations.isChecked(),
             self.check_joins.isChecked(),
+            self.check_dependencies.isChecked(),
+            self.check_raster_details.isChecked(),
         ]
         self.lb_info.setText('The output directory and at least one object and one type of output must be indicated')
 
@@ -105,17 +113,20 @@ class ProjectReportDockWidget(QtWidgets.QDockWidget, FORM_CLASS):
     def check_folder(self):
         """Check if the report folder for the project exists, and delete it if necessary."""
 
-        if os.path.exists(self.project.report_directory):
+        # The bundle is a single archive next to the report folder, the folder is only used by the other outputs
+        only_bundle = not (self.check_csv.isChecked() or self.check_html.isChecked() or self.check_ndjson.isChecked())
+
+        if os.path.exists(self.project.report_directory) and not only_bundle:
             reply = QMessageBox.question(self.iface.mainWindow(), 'Folder already exists',
                                          'The report folder <b>%s</b> already exists for this project.<br> '
                                          'If you continue, '
-                                         '<b>all the contents in CSV and HTML folders will be deleted</b>.<br> '
+                                         '<b>all the contents in CSV, HTML and NDJSON folders will be deleted</b>.<br> '
                                          'Do you want to continue?' % self.project.report_directory,
                                          QMessageBox.Yes, QMessageBox.No)
             if reply == QMessageBox.Yes:
                 reply2 = QMessageBox.question(self.iface.mainWindow(), 'Folder already exists',
                                              'Are you absolutely sure you want '
-                                             'to delete <b>ALL</b> the content in the CSV and HTML folders'
+                                             'to delete <b>ALL</b> the content in the CSV, HTML and NDJSON folders '
                                              'in <b>%s</b>?' % self.project.report_directory,
                                              QMessageBox.Yes, QMessageBox.No)
                 if reply2 == QMessageBox.Yes:
@@ -129,60 +140,47 @@ class ProjectReportDockWidget(QtWidgets.QDockWidget, FORM_CLASS):
     def create_reports(self):
         """Generate various reports for the QGIS project depending on the state of various `check_*` attributes."""
 
-        self.project.scaffolding()
-
-        if self.check_project.isChecked() and self.check_csv.isChecked():
-            csv_file_name = '01_project'
-            csv_column_names = self.project.project_column_names
-            csv_rows = self.project.project_data
-            self.project.create_csv_file(csv_file_name, csv_column_names, csv_rows, True)
-
-        if self.check_vector_layers.isChecked() and self.check_csv.isChecked():
-            csv_file_name = '02_layers_vectorial'
-            csv_column_names = self.project.vector_layers_column_names
-            csv_rows = self.project.vector_layers_data
-
-            self.project.create_csv_file(csv_file_name, csv_column_names, csv_rows)
-
-        if self.check_raster_layers.isChecked() and self.check_csv.isChecked():
-            csv_file_name = '02_layers_raster'
-            csv_column_names = self.project.raster_layers_column_names
-            csv_rows = self.project.raster_layers_data
-
-            self.project.create_csv_file(csv_file_name, csv_column_names, csv_rows)
-
-        if self.check_fields.isChecked() and self.check_csv.isChecked():
-            csv_file_name = '03_fields'
-            csv_column_names = self.project.layer_fields_column_names
-            csv_rows = self.project.layer_fields_data
-            self.project.create_csv_file(csv_file_name, csv_column_names, csv_rows)
-
-        if self.check_relations.isChecked() and self.check_csv.isChecked():
-            csv_file_name = '04_relations'
-            csv_column_names = self.project.project_relations_column_names
-            csv_rows = self.project.project_relations_data
-            self.project.create_csv_file(csv_file_name, csv_column_names, csv_rows)
-
-        if self.check_joins.isChecked() and self.check_csv.isChecked():
-            csv_file_name = '05_joins'
-            csv_column_names = self.project.layer_joins_column_names
-            csv_rows = self.project.layer_joins_data
-            self.project.create_csv_file(csv_file_name, csv_column_names, csv_rows)
-
-        if self.check_layouts.isChecked() and self.check_csv.isChecked():
-            csv_file_name = '06_layouts'
-            csv_column_names = self.project.layouts_column_names
-            csv_rows = self.project.layouts_data
-            self.project.create_csv_file(csv_file_name, csv_column_names, csv_rows)
-
-        if self.check_html.isChecked():
-            self.project.create_html(self.options_objets)
-        output_dir = f'<a href="file:///{self.project.report_directory}">{self.project.report_directory}</a>'
+        # The report is built again so that it includes the last changes of the project and the layer filter
+        self.project = QProjectReport(self.qgs_project, self.folder_path, self.layer_filter())
+
+        output_formats = [output_format for output_format, check in
+                          (('csv', self.check_csv), ('html', self.check_html), ('ndjson', self.check_ndjson),
+                           ('bundle', self.check_bundle))
+                          if check.isChecked()]
+        self.project.create_reports(self.selected_sections(), output_formats,
+                                    compress=self.check_ndjson_gzip.isChecked())
+
+        # A bundle-only run does not create the report folder, so the archive is linked instead
+        output_path = self.project.bundle_path() if output_formats == ['bundle'] else self.project.report_directory
+        output_dir = f'<a href="file:///{output_path}">{output_path}</a>'
         success_message = '😎 Project reports have been created in <b>%s</b>' % (
             output_dir)
 
         self.iface.messageBar().pushMessage("Success", success_message, level=Qgis.Success, duration=10)
 
+    def layer_filter(self):
+        """Returns the layer filter defined in the GUI"""
+
+        return LayerFilter(include={'name': split_patterns(self.le_include.text())},
+                           exclude={'name': split_patterns(self.le_exclude.text())},
+                           sample=self.spin_sample.value())
+
+    def selected_sections(self):
+        """Returns the names of the report sections selected in the GUI"""
+
+        checks = {
+            'project': self.check_project,
+            'vector_layers': self.check_vector_layers,
+            'raster_layers': self.check_raster_layers,
+            'fields': self.check_fields,
+            'relations': self.check_relations,
+            'joins': self.check_joins,
+            'layouts': self.check_layouts,
+            'dependencies': self.check_dependencies,
+            'raster_details': self.check_raster_details,
+        }
+        return [section for section in SECTIONS if checks[section].isChecked()]
+
     def set_folder(self):
         """Set the output folder for the reports"""
         self.folder_path = self.directoryWidget.filePath()
@@ -196,6 +194,8 @@ class ProjectReportDockWidget(QtWidgets.QDockWidget, FORM_CLASS):
         self.options_outputs = [
             self.check_csv.isChecked(),
             self.check_html.isChecked(),
+            self.check_ndjson.isChecked(),
+            self.check_bundle.isChecked(),
         ]
 
         self.options_objets = [
@@ -206,10 +206,12 @@ class ProjectReportDockWidget(QtWidgets.QDockWidget, FORM_CLASS):
             self.check_layouts.isChecked(),
             self.check_joins.isChecked(),
             self.check_relations.isChecked(),
+            self.check_dependencies.isChecked(),
+            self.check_raster_details.isChecked(),
         ]
 
-        any_check_objets = [False, False, False, False, False, False, False, False]
-        any_check_outputs = [False, False]
+        any_check_objets = [False, False, False, False, False, False, False, False, False]
+        any_check_outputs = [False, False, False, False]
 
         if self.options_objets == any_check_objets or self.options_outputs == any_check_outputs \
                 or self.folder_path == '':
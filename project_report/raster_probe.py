@@ -0,0 +1,202 @@
+import json
+import logging
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+RASTER_DETAILS_KEYS = ['bands', 'data_type', 'resolution_x', 'resolution_y', 'extent', 'nodata', 'overviews',
+                       'compression']
+
+logger = logging.getLogger(__name__)
+
+
+def probe_raster(source):
+    """Opens a raster dataset with GDAL and returns its main properties.
+
+    Parameters:
+    source (str): the GDAL data source (file path, /vsi path or connection string)
+
+    Returns:
+    dict: the properties of RASTER_DETAILS_KEYS, or an empty dict if the dataset cannot be opened
+    """
+
+    # GDAL is imported when a raster is opened, so it is not loaded with the plugin
+    from osgeo import gdal
+
+    try:
+        dataset = gdal.Open(source, gdal.GA_ReadOnly)
+    except RuntimeError:
+        dataset = None
+    if dataset is None:
+        return {}
+
+    geotransform = dataset.GetGeoTransform()
+    width = dataset.RasterXSize
+    height = dataset.RasterYSize
+    x_min = geotransform[0]
+    y_max = geotransform[3]
+    x_max = x_min + geotransform[1] * width + geotransform[2] * height
+    y_min = y_max + geotransform[4] * width + geotransform[5] * height
+
+    band = dataset.GetRasterBand(1) if dataset.RasterCount > 0 else None
+
+    details = {
+        'bands': dataset.RasterCount,
+        'data_type': gdal.GetDataTypeName(band.DataType) if band is not None else '',
+        'resolution_x': abs(geotransform[1]),
+        'resolution_y': abs(geotransform[5]),
+        'extent': '{}, {}, {}, {}'.format(x_min, min(y_min, y_max), x_max, max(y_min, y_max)),
+        'nodata': band.GetNoDataValue() if band is not None else None,
+        'overviews': band.GetOverviewCount() if band is not None else 0,
+        'compression': dataset.GetMetadataItem('COMPRESSION', 'IMAGE_STRUCTURE') or '',
+    }
+    dataset = None
+
+    return details
+
+
+def read_cache_file(cache_file):
+    """Returns the entries of a cache file, or an empty dict if it is missing or cannot be read."""
+
+    try:
+        with open(cache_file, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+class RasterProbeCache:
+    """Persistent cache of raster properties in a JSON file. The entries are keyed by dataset (normalized file path
+    and subdataset or layer name) and are only valid while the modification time and size of the file do not change.
+
+    The cache file can be shared by several QGIS processes (e.g. the workers of the watch mode): each save merges
+    the entries written by the other processes and replaces the file atomically."""
+
+    def __init__(self, cache_file, log=None):
+        """Class Constructor. Loads the cache file if it exists.
+
+        :param cache_file: Path of the JSON cache file
+        :type cache_file: str
+
+        :param log: Function that receives the warning messages of the cache (Python logging by default)
+        :type log: function
+        """
+
+        self.cache_file = cache_file
+        self.log = log or logger.warning
+        self.entries = read_cache_file(self.cache_file)
+        self.new_entries = {}
+
+    def get(self, key, signature):
+        """Returns the cached properties of a dataset, or None if they are missing or outdated.
+
+        :param key: Dataset key
+        :type key: str
+
+        :param signature: [mtime, size] of the file of the dataset
+        :type signature: list
+        """
+
+        entry = self.entries.get(key)
+        if entry is not None and entry['signature'] == signature:
+            return entry['details']
+        return None
+
+    def set(self, key, signature, details):
+        """Stores the properties of a dataset.
+
+        :param key: Dataset key
+        :type key: str
+
+        :param signature: [mtime, size] of the file of the dataset
+        :type signature: list
+
+        :param details: Properties of the raster
+        :type details: dict
+        """
+
+        entry = {'signature': signature, 'details': details}
+        self.entries[key] = entry
+        self.new_entries[key] = entry
+
+    def save(self):
+        """Writes the cache file if there are new entries. A cache that cannot be written is not an error, the
+        rasters are opened again in the next run.
+
+        :returns: False if the cache file could not be written
+        :rtype: bool
+        """
+
+        if not self.new_entries:
+            return True
+
+        directory = os.path.dirname(self.cache_file) or '.'
+        temp_file = None
+        try:
+            os.makedirs(directory, exist_ok=True)
+            # Entries written by other processes since the cache was loaded are kept
+            entries = read_cache_file(self.cache_file)
+            entries.update(self.new_entries)
+            handle, temp_file = tempfile.mkstemp(dir=directory, prefix=os.path.basename(self.cache_file),
+                                                 suffix='.tmp')
+            with os.fdopen(handle, 'w', encoding='utf-8') as f:
+                json.dump(entries, f)
+            os.replace(temp_file, self.cache_file)
+        except OSError as e:
+            self.log('The raster cache file {} could not be written: {}'.format(self.cache_file, e))
+            if temp_file is not None and os.path.exists(temp_file):
+                os.remove(temp_file)
+            return False
+
+        self.entries = entries
+        self.new_entries = {}
+        return True
+
+
+def file_signature(path):
+    """Returns the [mtime, size] signature of a file, or None if the path is not a local file."""
+
+    try:
+        stat = os.stat(path)
+    except (OSError, ValueError):
+        return None
+    return [stat.st_mtime, stat.st_size]
+
+
+def probe_rasters(datasets, cache=None, max_workers=8):
+    """Returns the properties of several rasters. Each dataset is opened only once, the datasets are opened
+    concurrently and the rasters whose file has not changed are read from the cache.
+
+    Parameters:
+    datasets (dict): a dictionary with the dataset keys as keys and (GDAL data source, file path) tuples as values
+    cache (RasterProbeCache, optional): persistent cache of properties
+    max_workers (int, optional): maximum number of datasets opened at the same time
+
+    Returns:
+    dict: a dictionary with the dataset keys as keys and their properties as values
+    """
+
+    details = {}
+    signatures = {}
+    pending = []
+
+    for key, (source, path) in datasets.items():
+        signatures[key] = file_signature(path)
+        cached = cache.get(key, signatures[key]) if cache is not None and signatures[key] else None
+        if cached is not None:
+            details[key] = cached
+        else:
+            pending.append(key)
+
+    if pending:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            sources = [datasets[key][0] for key in pending]
+            for key, dataset_details in zip(pending, executor.map(probe_raster, sources)):
+                details[key] = dataset_details
+                if cache is not None and signatures[key] and dataset_details:
+                    cache.set(key, signatures[key], dataset_details)
+
+    if cache is not None:
+        cache.save()
+
+    return details
@@ -0,0 +1,351 @@
+"""Comparison of two QGIS project reports. Usage from the command line (QGIS Python environment):
+
+    python -m project_report.report_diff /reports/v1/my_project /projects/my_project.qgz /reports/diff
+"""
+
+import argparse
+import csv
+import html
+import os
+
+from qgis.core import QgsApplication, QgsProject
+
+from .QProjectReport import CSS, SECTIONS, SECTION_FILE_NAMES, QProjectReport, create_table
+
+# Columns that identify the rows of each section. The first candidate whose columns are in both reports and are
+# not positional is used, so reports created before the stable ids (layer and relation ids) can still be compared
+DIFF_KEYS = {'project': [()],
+             'vector_layers': [('id',), ('name',)],
+             'raster_layers': [('id',), ('name',)],
+             'fields': [('layer_id', 'field_name'), ('layer', 'field_name')],
+             'relations': [('id',), ('name',)],
+             'joins': [('layer_id', 'join_layer_id', 'target_field_name'), ('layer', 'join_layer', 'target_field_name')],
+             'layouts': [('layout_name',)],
+             'dependencies': [('source_id', 'target_id', 'kind'), ('source', 'target', 'kind')],
+             'raster_details': [('id',)],
+             }
+
+# Positional columns that change when objects are reordered and are not compared
+IGNORED_COLUMNS = ('id',)
+
+PROJECT_EXTENSIONS = ('.qgs', '.qgz')
+
+
+def to_text(value):
+    """Returns the value as it is written in the CSV files of a report."""
+
+    return '' if value is None else str(value)
+
+
+def load_report_csv(report_directory, sections=SECTIONS):
+    """Loads the sections of a stored report from its CSV files.
+
+    Parameters:
+    report_directory (str): the report directory or its csv subdirectory
+    sections (list, optional): the names of the sections to be loaded (all by default)
+
+    Returns:
+    dict: section name -> (column names, rows); sections without CSV file are not included
+    """
+
+    csv_directory = os.path.join(report_directory, 'csv')
+    if not os.path.isdir(csv_directory):
+        csv_directory = report_directory
+
+    report = {}
+    for section in sections:
+        csv_file = os.path.join(csv_directory, SECTION_FILE_NAMES[section] + '.csv')
+        if not os.path.exists(csv_file):
+            continue
+        with open(csv_file, newline='', encoding='utf-8') as f:
+            reader = csv.reader(f, delimiter=';', quotechar='"')
+            column_names = next(reader, [])
+            report[section] = (column_names, [row for row in reader])
+
+    return report
+
+
+def load_report_object(report, sections=SECTIONS):
+    """Returns the sections of a QProjectReport object.
+
+    Parameters:
+    report (QProjectReport): the report
+    sections (list, optional): the names of the sections to be collected (all by default)
+
+    Returns:
+    dict: section name -> (column names, rows)
+    """
+
+    return {section: (report.column_names(section),
+                      [[to_text(v) for v in row] for row in report.iter_section(section)])
+            for section in sections}
+
+
+def load_report_project(project_file, sections=SECTIONS):
+    """Builds a report from a QGIS project file and returns its sections.
+
+    Parameters:
+    project_file (str): path of the .qgs or .qgz file
+    sections (list, optional): the names of the sections to be collected (all by default)
+
+    Returns:
+    dict: section name -> (column names, rows)
+    """
+
+    qgsproject = QgsProject()
+    if not qgsproject.read(project_file):
+        raise IOError('The project file {} could not be read'.format(project_file))
+
+    return load_report_object(QProjectReport(qgsproject, os.path.dirname(project_file)), sections)
+
+
+def is_stored_report(source):
+    """Returns True if the report source is a stored report directory."""
+
+    return isinstance(source, str) and not source.lower().endswith(PROJECT_EXTENSIONS)
+
+
+def load_report(source, sections=SECTIONS):
+    """Loads the sections of a report from a stored report directory, a QProjectReport object
+    or a QGIS project file.
+
+    Parameters:
+    source (str or QProjectReport): the report source
+    sections (list, optional): the names of the sections to be loaded (all by default)
+
+    Returns:
+    dict: section name -> (column names, rows)
+    """
+
+    if isinstance(source, str):
+        if source.lower().endswith(PROJECT_EXTENSIONS):
+            return load_report_project(source, sections)
+        return load_report_csv(source, sections)
+
+    return load_report_object(source, sections)
+
+
+def is_positional(column_names, rows, column):
+    """Returns True if an id column only has row numbers, as in the reports created before the stable ids."""
+
+    if not column.endswith('id') or column not in column_names or not rows:
+        return False
+    position = column_names.index(column)
+    return all(row[position].isdigit() for row in rows)
+
+
+def key_columns(candidates, old, new):
+    """Returns the key columns used to compare a section of two reports.
+
+    Parameters:
+    candidates (list): the candidate key columns of the section, in order of preference
+    old (tuple): (column names, rows) of the old report
+    new (tuple): (column names, rows) of the new report
+
+    Returns:
+    tuple: the names of the columns that identify a row
+    """
+
+    for candidate in candidates:
+        if all(c in old[0] and c in new[0] and not is_positional(old[0], old[1], c)
+               and not is_positional(new[0], new[1], c) for c in candidate):
+            return candidate
+    return candidates[-1]
+
+
+def index_rows(column_names, rows, key_columns):
+    """Indexes the rows of a section in a dictionary by their key columns.
+
+    Rows with the same key are not dropped: the second and following ones get the number of
+    occurrence as an extra key item, and the duplicated keys are returned.
+
+    Parameters:
+    column_names (list): the column names of the section
+    rows (list): the rows of the section
+    key_columns (tuple): the names of the columns that identify a row
+
+    Returns:
+    tuple: (key -> {column name: value}, duplicated key -> number of rows)
+    """
+
+    positions = [column_names.index(c) for c in key_columns if c in column_names]
+    index = {}
+    occurrences = {}
+    for row in rows:
+        key = tuple(row[p] for p in positions)
+        occurrences[key] = occurrences.get(key, 0) + 1
+        if occurrences[key] > 1:
+            key += ('#{}'.format(occurrences[key]),)
+        index[key] = dict(zip(column_names, row))
+    return index, {key: count for key, count in occurrences.items() if count > 1}
+
+
+def diff_section(section, old, new, candidates):
+    """Compares a section of two reports.
+
+    Parameters:
+    section (str): the section name
+    old (tuple): (column names, rows) of the old report
+    new (tuple): (column names, rows) of the new report
+    candidates (list): the candidate key columns of the section (see DIFF_KEYS)
+
+    Returns:
+    list: a list of [section, change, key, column, old_value, new_value] rows
+    """
+
+    section_key_columns = key_columns(candidates, old, new)
+    old_index, old_duplicates = index_rows(old[0], old[1], section_key_columns)
+    new_index, new_duplicates = index_rows(new[0], new[1], section_key_columns)
+    changes = []
+
+    # Rows with a duplicated key are matched in order of appearance, which may not pair the same objects
+    for key in sorted(set(old_duplicates) | set(new_duplicates)):
+        changes.append([section, 'duplicate_key', ' | '.join(key), ', '.join(section_key_columns),
+                        old_duplicates.get(key, 1 if key in old_index else 0),
+                        new_duplicates.get(key, 1 if key in new_index else 0)])
+
+    for key, old_record in old_index.items():
+        key_text = ' | '.join(key)
+        new_record = new_index.get(key)
+        if new_record is None:
+            changes.append([section, 'removed', key_text, '', '', ''])
+            continue
+        for column, old_value in old_record.items():
+            if column in IGNORED_COLUMNS and column not in section_key_columns:
+                continue
+            new_value = new_record.get(column, '')
+            if old_value != new_value:
+                changes.append([section, 'changed', key_text, column, old_value, new_value])
+
+    for key in new_index:
+        if key not in old_index:
+            changes.append([section, 'added', ' | '.join(key), '', '', ''])
+
+    return changes
+
+
+def source_name(source):
+    """Returns the name of a report source shown in the change report."""
+
+    if isinstance(source, str):
+        return source
+    return os.path.join(source.project_file_path, source.project_file_name) or source.project_data[0] \
+        or 'untitled_project'
+
+
+class QReportDiff:
+    """Class with the changes between two QGIS project reports and generation of output files."""
+
+    def __init__(self, old_source, new_source, output_directory):
+        """Class Constructor. Loads both reports and compares them section by section.
+
+        :param old_source: Old report (report directory, QProjectReport or .qgs/.qgz project file)
+        :type old_source: str or QProjectReport
+
+        :param new_source: New report (report directory, QProjectReport or .qgs/.qgz project file)
+        :type new_source: str or QProjectReport
+
+        :param output_directory: Directory for the change report files
+        :type output_directory: str
+        """
+
+        self.old_source = old_source
+        self.new_source = new_source
+        self.folder = output_directory
+
+        # A stored report is loaded first, so a report built from a project only collects the sections that can
+        # be compared (raster details and dependencies open rasters and parse expressions)
+        new_first = is_stored_report(new_source) and not is_stored_report(old_source)
+        first_source, second_source = (new_source, old_source) if new_first else (old_source, new_source)
+        first_report = load_report(first_source)
+        second_report = load_report(second_source, [section for section in SECTIONS if section in first_report])
+        old_report, new_report = (second_report, first_report) if new_first else (first_report, second_report)
+
+        self.diff_column_names = ['section', 'change', 'key', 'column', 'old_value', 'new_value']
+        self.diff_data = []
+
+        for section in SECTIONS:
+            # Sections not exported in both reports cannot be compared
+            if section not in old_report or section not in new_report:
+                continue
+            self.diff_data.extend(diff_section(section, old_report[section], new_report[section],
+                                               DIFF_KEYS[section]))
+
+    def create_csv_file(self, file_name='report_diff'):
+        """
+        Creates a CSV file with the changes between both reports.
+
+        Parameters:
+            - file_name (str): The name of the file to be created, without the file extension.
+
+        Returns:
+            None
+        """
+
+        csv_file = os.path.join(self.folder, file_name + '.csv')
+
+        with open(csv_file, mode='w', newline='', encoding='utf-8') as csv_file:
+            writer = csv.writer(csv_file, delimiter=';',
+                                quotechar='"', quoting=csv.QUOTE_MINIMAL)
+            writer.writerow(self.diff_column_names)
+            writer.writerows(self.diff_data)
+
+    def create_html(self, file_name='report_diff'):
+        """Create HTML change report file"""
+
+        html_file = os.path.join(self.folder, file_name + '.html')
+        html_string = """<html>
+                        <head>{}</head>
+                        <body>
+                        <h1>QGIS Project Report changes</h1>
+                        <p><b>Old:</b> {}<br><b>New:</b> {}</p>""".format(CSS, html.escape(source_name(self.old_source)),
+                                                                     html.escape(source_name(self.new_source)))
+
+        for section in SECTIONS:
+            section_changes = [row[1:] for row in self.diff_data if row[0] == section]
+            if section_changes:
+                html_string += create_table('<h2>{}</h2>'.format(section.replace('_', ' ').capitalize()),
+                                            self.diff_column_names[1:],
+                                            [[html.escape(str(cell)) for cell in row] for row in section_changes])
+
+        if not self.diff_data:
+            html_string += "<p>No changes found.</p>"
+
+        html_string += """<footer> <p>Generated with "Project Reports" QGIS plugin by Patricio Soriano <a
+        href="https://sigdeletras.com/">@SIGdeletras</a></p> </footer> """
+
+        html_string += "</body></html>"
+
+        with open(html_file, 'w', encoding='utf-8') as html_file:
+            html_file.write(html_string)
+
+
+def main(args=None):
+    """Command line entry point of the report comparison."""
+
+    parser = argparse.ArgumentParser(description='Compare two QGIS project reports and write the changes to '
+                                                 'report_diff.csv and report_diff.html.')
+    parser.add_argument('old', help='old report directory or .qgs/.qgz project file')
+    parser.add_argument('new', help='new report directory or .qgs/.qgz project file')
+    parser.add_argument('output_directory', help='directory where the change report files are created')
+    options = parser.parse_args(args)
+
+    # Project files are read with QGIS, which needs an initialized application
+    qgs_application = None
+    if any(source.lower().endswith(PROJECT_EXTENSIONS) for source in (options.old, options.new)):
+        qgs_application = QgsApplication([], False)
+        qgs_application.initQgis()
+
+    try:
+        os.makedirs(options.output_directory, exist_ok=True)
+        diff = QReportDiff(options.old, options.new, options.output_directory)
+        diff.create_csv_file()
+        diff.create_html()
+        print('{} changes written to {}'.format(len(diff.diff_data), options.output_directory))
+    finally:
+        if qgs_application is not None:
+            qgs_application.exitQgis()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+"""Names of the report sections and output formats. This module has no QGIS dependencies, so it can be used by
+the command line tools of the plugin."""
+
+SECTIONS = ['project', 'vector_layers', 'raster_layers', 'fields', 'relations', 'joins', 'layouts', 'dependencies',
+            'raster_details']
+
+# Order of the sections in the check_objets list of create_html
+HTML_SECTIONS = ['project', 'vector_layers', 'raster_layers', 'fields', 'layouts', 'joins', 'relations', 'dependencies',
+                 'raster_details']
+
+OUTPUT_FORMATS = ['csv', 'html', 'ndjson', 'bundle']
+
+# Archive formats of the bundle output
+BUNDLE_FORMATS = ['zip', 'tar.zst']
+
+SECTION_COLUMN_NAMES = {'project': 'project_column_names',
+                        'vector_layers': 'vector_layers_column_names',
+                        'raster_layers': 'raster_layers_column_names',
+                        'fields': 'layer_fields_column_names',
+                        'relations': 'project_relations_column_names',
+                        'joins': 'layer_joins_column_names',
+                        'layouts': 'layouts_column_names',
+                        'dependencies': 'dependencies_column_names',
+                        'raster_details': 'raster_details_column_names',
+                        }
+
+SECTION_FILE_NAMES = {'project': '01_project',
+                      'vector_layers': '02_layers_vectorial',
+                      'raster_layers': '02_layers_raster',
+                      'fields': '03_fields',
+                      'relations': '04_relations',
+                      'joins': '05_joins',
+                      'layouts': '06_layouts',
+                      'dependencies': '07_dependencies',
+                      'raster_details': '08_raster_details',
+                      }
+
+# Criteria that can be used to include or exclude layers, from the cheapest to the most expensive to evaluate
+CRITERIA = ['name', 'provider', 'group', 'storage']
@@ -0,0 +1,312 @@
+"""Watch mode: regenerates the reports of the QGIS projects of a folder when their files change.
+
+The reports are generated with the "Generate project report" Processing algorithm through qgis_process, so the
+watcher itself does not need QGIS and several reports can be built at the same time. Usage:
+
+    python -m project_report.watcher /projects /reports --sections project vector_layers --formats csv html
+"""
+
+import argparse
+import logging
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+
+from .sections import BUNDLE_FORMATS, OUTPUT_FORMATS, SECTIONS
+
+PROJECT_EXTENSIONS = ('.qgs', '.qgz')
+
+ALGORITHM_ID = 'projectreport:generateprojectreport'
+
+logger = logging.getLogger(__name__)
+
+
+def output_folder(project_file, directory, output_directory):
+    """Returns the folder where the report of a project file is created. The subfolders of the watched folder are
+    mirrored in the output directory, so projects with the same name in different subfolders do not share their
+    report.
+
+    Parameters:
+    project_file (str): path of the .qgs or .qgz file
+    directory (str): the watched folder
+    output_directory (str): directory where the reports are created
+
+    Returns:
+    str: the output folder of the project
+    """
+
+    relative_folder = os.path.relpath(os.path.dirname(os.path.abspath(project_file)), os.path.abspath(directory))
+    return os.path.normpath(os.path.join(output_directory, relative_folder))
+
+
+def report_directory(project_file, directory, output_directory):
+    """Returns the report directory of a project file, as created by QProjectReport.
+
+    Parameters:
+    project_file (str): path of the .qgs or .qgz file
+    directory (str): the watched folder
+    output_directory (str): directory where the reports are created
+
+    Returns:
+    str: the report directory
+    """
+
+    return os.path.join(output_folder(project_file, directory, output_directory),
+                        os.path.basename(project_file).split('.')[0])
+
+
+def run_qgis_process(project_file, output_directory, sections, output_formats, qgis_process='qgis_process'):
+    """Generates the report of a project file with qgis_process.
+
+    Parameters:
+    project_file (str): path of the .qgs or .qgz file
+    output_directory (str): directory where the report is created
+    sections (list): names of the sections to be reported (see SECTIONS)
+    output_formats (list): output formats (see OUTPUT_FORMATS)
+    qgis_process (str, optional): qgis_process executable
+
+    Returns:
+    bool: True if the report was generated
+    """
+
+    command = [qgis_process, 'run', ALGORITHM_ID, '--PROJECT_FILE={}'.format(project_file),
+               '--OUTPUT_FOLDER={}'.format(output_directory)]
+    command += ['--SECTIONS={}'.format(SECTIONS.index(section)) for section in sections]
+    command += ['--OUTPUT_FORMATS={}'.format(OUTPUT_FORMATS.index(output_format)) for output_format in output_formats]
+
+    result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True)
+    if result.returncode != 0:
+        logger.error('Report of %s failed:\n%s', project_file, result.stdout)
+    return result.returncode == 0
+
+
+def check_qgis_process(qgis_process='qgis_process'):
+    """Checks that qgis_process can load the "Generate project report" algorithm of the plugin.
+
+    Parameters:
+    qgis_process (str, optional): qgis_process executable
+
+    Returns:
+    tuple: (True if the algorithm is available, output of qgis_process)
+    """
+
+    try:
+        result = subprocess.run([qgis_process, 'help', ALGORITHM_ID], stdout=subprocess.PIPE,
+                                stderr=subprocess.STDOUT, universal_newlines=True)
+    except OSError as e:
+        return False, str(e)
+    return result.returncode == 0, result.stdout
+
+
+class ProjectWatcher:
+    """Watches the QGIS project files of a folder and rebuilds the reports of the projects that change.
+
+    Changes are debounced (a project is rebuilt once it has not changed for `debounce` seconds) and the rebuilds
+    go through a bounded queue served by a fixed number of workers, so a bulk checkout does not start hundreds of
+    rebuilds at the same time. A project that changes while its report is being built is rebuilt again later."""
+
+    def __init__(self, directory, output_directory, sections=None, output_formats=None, debounce=2.0,
+                 max_workers=2, max_queue=100, builder=None):
+        """Class Constructor.
+
+        :param directory: Folder with the project files (subfolders are included)
+        :type directory: str
+
+        :param output_directory: Directory where the reports are created
+        :type output_directory: str
+
+        :param sections: Sections to be reported (all by default)
+        :type sections: list
+
+        :param output_formats: Output formats (CSV and HTML by default)
+        :type output_formats: list
+
+        :param debounce: Seconds without changes before a project is rebuilt
+        :type debounce: float
+
+        :param max_workers: Number of reports built at the same time
+        :type max_workers: int
+
+        :param max_queue: Maximum number of projects waiting to be built
+        :type max_queue: int
+
+        :param builder: Function that receives a project file and its output folder and builds its report
+            (qgis_process by default)
+        :type builder: function
+        """
+
+        self.directory = directory
+        self.output_directory = output_directory
+        self.sections = sections or list(SECTIONS)
+        self.output_formats = output_formats or ['csv', 'html']
+        self.debounce = debounce
+        self.builder = builder or (lambda project_file, folder: run_qgis_process(project_file, folder, self.sections,
+                                                                                self.output_formats))
+
+        # Last seen (mtime, size) of each project file
+        self.signatures = {}
+        # Project files changed and not queued yet, with the time of their last change (None if ready to be built)
+        self.pending = {}
+        # Project files queued or being built, with their report directory
+        self.scheduled = {}
+
+        self.lock = threading.Lock()
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.stopped = threading.Event()
+        self.workers = [threading.Thread(target=self.work, daemon=True) for _ in range(max_workers)]
+        for worker in self.workers:
+            worker.start()
+
+    def project_files(self):
+        """Yields the project files of the watched folder."""
+
+        for root, dirs, files in os.walk(self.directory):
+            for name in files:
+                if name.lower().endswith(PROJECT_EXTENSIONS):
+                    yield os.path.join(root, name)
+
+    def needs_report(self, project_file, mtime):
+        """Returns True if the report (directory or bundle) of a project file is missing or older than the file."""
+
+        directory = report_directory(project_file, self.directory, self.output_directory)
+        reports = [directory] + ['{}.{}'.format(directory, bundle_format) for bundle_format in BUNDLE_FORMATS]
+        report_times = [os.path.getmtime(report) for report in reports if os.path.exists(report)]
+        return not report_times or max(report_times) < mtime
+
+    def poll(self):
+        """Scans the watched folder once and queues the projects whose changes are older than the debounce time.
+
+        :returns: Number of projects queued
+        :rtype: int
+        """
+
+        now = time.monotonic()
+        found = set()
+
+        for project_file in self.project_files():
+            try:
+                stat = os.stat(project_file)
+            except OSError:
+                continue
+            found.add(project_file)
+            signature = (stat.st_mtime, stat.st_size)
+            previous = self.signatures.get(project_file)
+            self.signatures[project_file] = signature
+            if previous is None:
+                # First scan: only the projects without an up-to-date report are built, without waiting
+                if self.needs_report(project_file, stat.st_mtime):
+                    self.pending[project_file] = None
+            elif previous != signature:
+                self.pending[project_file] = now
+
+        # Projects deleted or renamed since the last scan are forgotten, even if they were waiting to be built
+        for project_file in set(self.signatures) - found:
+            del self.signatures[project_file]
+            self.pending.pop(project_file, None)
+
+        queued = 0
+        # Projects ready since the first scan (None) go first, then the oldest changes
+        for project_file, changed in sorted(self.pending.items(),
+                                            key=lambda item: float('-inf') if item[1] is None else item[1]):
+            if changed is not None and now - changed < self.debounce:
+                continue
+            directory = report_directory(project_file, self.directory, self.output_directory)
+            with self.lock:
+                # Projects that share a report directory (e.g. x.qgs and x.qgz) are never built at the same time
+                if project_file in self.scheduled or directory in self.scheduled.values():
+                    continue
+                try:
+                    self.queue.put_nowait(project_file)
+                except queue.Full:
+                    break
+                self.scheduled[project_file] = directory
+            del self.pending[project_file]
+            queued += 1
+
+        return queued
+
+    def work(self):
+        """Builds the reports of the queued projects until the watcher is stopped."""
+
+        while not self.stopped.is_set():
+            try:
+                project_file = self.queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            try:
+                if not os.path.exists(project_file):
+                    logger.info('Skipping %s, the project file no longer exists', project_file)
+                    continue
+                logger.info('Building report of %s', project_file)
+                folder = output_folder(project_file, self.directory, self.output_directory)
+                os.makedirs(folder, exist_ok=True)
+                self.builder(project_file, folder)
+            except Exception as e:
+                logger.error('Report of %s failed: %s', project_file, e)
+            finally:
+                with self.lock:
+                    self.scheduled.pop(project_file, None)
+                self.queue.task_done()
+
+    def run(self, interval=1.0):
+        """Polls the watched folder every `interval` seconds until stop() is called.
+
+        :param interval: Seconds between scans
+        :type interval: float
+        """
+
+        logger.info('Watching %s', self.directory)
+        while not self.stopped.is_set():
+            self.poll()
+            self.stopped.wait(interval)
+
+    def stop(self):
+        """Stops polling and the workers. The reports being built are finished."""
+
+        self.stopped.set()
+        for worker in self.workers:
+            worker.join()
+
+
+def main(args=None):
+    """Command line entry point of the watch mode."""
+
+    parser = argparse.ArgumentParser(description='Regenerate the reports of the QGIS projects of a folder '
+                                                 'when their files change.')
+    parser.add_argument('directory', help='folder with the .qgs/.qgz project files')
+    parser.add_argument('output_directory', help='directory where the reports are created')
+    parser.add_argument('--sections', nargs='+', choices=SECTIONS, default=list(SECTIONS))
+    parser.add_argument('--formats', nargs='+', choices=OUTPUT_FORMATS, default=['csv', 'html'])
+    parser.add_argument('--debounce', type=float, default=2.0, help='seconds without changes before a rebuild')
+    parser.add_argument('--workers', type=int, default=2, help='number of reports built at the same time')
+    parser.add_argument('--max-queue', type=int, default=100, help='maximum number of projects waiting')
+    parser.add_argument('--interval', type=float, default=1.0, help='seconds between scans')
+    parser.add_argument('--qgis-process', default='qgis_process', help='qgis_process executable')
+    options = parser.parse_args(args)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(message)s')
+
+    # Every rebuild would fail if the plugin cannot be loaded by qgis_process, so the watcher does not start
+    available, output = check_qgis_process(options.qgis_process)
+    if not available:
+        logger.error('The %s algorithm is not available in %s. Install and enable the Project Reports plugin '
+                     'for qgis_process (qgis_process plugins enable project_report).\n%s',
+                     ALGORITHM_ID, options.qgis_process, output)
+        return 1
+
+    watcher = ProjectWatcher(options.directory, options.output_directory, options.sections, options.formats,
+                             debounce=options.debounce, max_workers=options.workers, max_queue=options.max_queue,
+                             builder=lambda project_file, folder: run_qgis_process(project_file, folder,
+                                                                                   options.sections, options.formats,
+                                                                                   options.qgis_process))
+    try:
+        watcher.run(options.interval)
+    except KeyboardInterrupt:
+        watcher.stop()
+
+
+if __name__ == '__main__':
+    sys.exit(main())